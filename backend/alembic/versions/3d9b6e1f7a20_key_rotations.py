@@ -0,0 +1,41 @@
+"""key rotations
+
+Revision ID: 3d9b6e1f7a20
+Revises: 8a4f0c6b2e15
+Create Date: 2026-10-18 14:05:37.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9b6e1f7a20'
+down_revision: Union[str, None] = '8a4f0c6b2e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Checkpoints of the re-encryption job, one row per target key
+    op.create_table('key_rotations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('key_id', sa.String(), nullable=False),
+    sa.Column('last_password_id', sa.Integer(), nullable=False),
+    sa.Column('rotated', sa.Integer(), nullable=False),
+    sa.Column('already_current', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key_id')
+    )
+    op.create_index(op.f('ix_key_rotations_id'), 'key_rotations', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_key_rotations_id'), table_name='key_rotations')
+    op.drop_table('key_rotations')
@@ -0,0 +1,44 @@
+"""hot path indexes
+
+Revision ID: 5c2e7a41d9f3
+Revises: bd91b05cfbb0
+Create Date: 2026-10-18 09:12:40.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e7a41d9f3'
+down_revision: Union[str, None] = 'bd91b05cfbb0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build concurrently on Postgres so existing vaults stay writable.
+    # CONCURRENTLY cannot run inside a transaction.
+    concurrently = op.get_bind().dialect.name == 'postgresql'
+    with op.get_context().autocommit_block():
+        op.create_index('ix_passwords_owner_id_id', 'passwords', ['owner_id', 'id'], unique=False,
+                        postgresql_concurrently=concurrently)
+        op.create_index('ix_shared_passwords_password_id_shared_with_id', 'shared_passwords',
+                        ['password_id', 'shared_with_id'], unique=False,
+                        postgresql_concurrently=concurrently)
+        op.create_index('ix_shared_passwords_shared_with_id_status_expires_at', 'shared_passwords',
+                        ['shared_with_id', 'status', 'expires_at'], unique=False,
+                        postgresql_concurrently=concurrently)
+        op.create_index('ix_shared_passwords_active_shared_with_id_expires_at', 'shared_passwords',
+                        ['shared_with_id', 'expires_at'], unique=False,
+                        postgresql_where=sa.text("status = 'ACTIVE'"),
+                        postgresql_concurrently=concurrently)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_shared_passwords_active_shared_with_id_expires_at', table_name='shared_passwords')
+    op.drop_index('ix_shared_passwords_shared_with_id_status_expires_at', table_name='shared_passwords')
+    op.drop_index('ix_shared_passwords_password_id_shared_with_id', table_name='shared_passwords')
+    op.drop_index('ix_passwords_owner_id_id', table_name='passwords')
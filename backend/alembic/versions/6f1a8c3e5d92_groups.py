@@ -0,0 +1,78 @@
+"""groups
+
+Revision ID: 6f1a8c3e5d92
+Revises: 9b3d5f7e2a41
+Create Date: 2026-10-18 20:12:08.903114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f1a8c3e5d92'
+down_revision: Union[str, None] = '9b3d5f7e2a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Groups share a password once; members get access through the membership join
+    op.create_table('groups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_groups_id'), 'groups', ['id'], unique=False)
+    op.create_index(op.f('ix_groups_owner_id'), 'groups', ['owner_id'], unique=False)
+    op.create_table('group_members',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('group_id', 'user_id')
+    )
+    op.create_index('ix_group_members_user_id_group_id', 'group_members', ['user_id', 'group_id'], unique=False)
+    # The share status enum type already exists (shared_passwords)
+    status = postgresql.ENUM('ACTIVE', 'EXPIRED', 'REVOKED', name='sharestatus', create_type=False)
+    op.create_table('group_shares',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('password_id', sa.Integer(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('status', status, nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('expires_in_hours', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ),
+    sa.ForeignKeyConstraint(['password_id'], ['passwords.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_group_shares_id'), 'group_shares', ['id'], unique=False)
+    op.create_index('uq_group_shares_password_id_group_id', 'group_shares', ['password_id', 'group_id'], unique=True)
+    op.create_index('ix_group_shares_group_id_status_expires_at', 'group_shares',
+                    ['group_id', 'status', 'expires_at'], unique=False)
+    op.create_index('ix_group_shares_active_expires_at', 'group_shares', ['expires_at'], unique=False,
+                    postgresql_where=sa.text("status = 'ACTIVE'"),
+                    sqlite_where=sa.text("status = 'ACTIVE'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_group_shares_active_expires_at', table_name='group_shares')
+    op.drop_index('ix_group_shares_group_id_status_expires_at', table_name='group_shares')
+    op.drop_index('uq_group_shares_password_id_group_id', table_name='group_shares')
+    op.drop_index(op.f('ix_group_shares_id'), table_name='group_shares')
+    op.drop_table('group_shares')
+    op.drop_index('ix_group_members_user_id_group_id', table_name='group_members')
+    op.drop_table('group_members')
+    op.drop_index(op.f('ix_groups_owner_id'), table_name='groups')
+    op.drop_index(op.f('ix_groups_id'), table_name='groups')
+    op.drop_table('groups')
@@ -0,0 +1,32 @@
+"""share expiry index
+
+Revision ID: 8a4f0c6b2e15
+Revises: 5c2e7a41d9f3
+Create Date: 2026-10-18 11:40:02.581934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4f0c6b2e15'
+down_revision: Union[str, None] = '5c2e7a41d9f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lets the expiry sweeper find due shares without touching expired/revoked rows
+    concurrently = op.get_bind().dialect.name == 'postgresql'
+    with op.get_context().autocommit_block():
+        op.create_index('ix_shared_passwords_active_expires_at', 'shared_passwords', ['expires_at'], unique=False,
+                        postgresql_where=sa.text("status = 'ACTIVE'"),
+                        sqlite_where=sa.text("status = 'ACTIVE'"),
+                        postgresql_concurrently=concurrently)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_shared_passwords_active_expires_at', table_name='shared_passwords')
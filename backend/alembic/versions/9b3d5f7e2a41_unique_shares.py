@@ -0,0 +1,51 @@
+"""unique shares
+
+Revision ID: 9b3d5f7e2a41
+Revises: e4a9b2c6d1f7
+Create Date: 2026-10-18 19:05:37.412806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3d5f7e2a41'
+down_revision: Union[str, None] = 'e4a9b2c6d1f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Re-shares used to insert a new row each time. Keep one row per password
+    # and recipient, preferring a live one, then the latest expiry
+    op.execute(sa.text("""
+        DELETE FROM shared_passwords WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY password_id, shared_with_id
+                    ORDER BY CASE WHEN status = 'ACTIVE' THEN 0 ELSE 1 END, expires_at DESC, id DESC
+                ) AS rank
+                FROM shared_passwords
+            ) AS ranked
+            WHERE rank > 1
+        )
+    """))
+    # The unique index replaces the plain one on the same columns. Built
+    # concurrently on Postgres so shares stay writable; CONCURRENTLY cannot
+    # run inside a transaction, so the dedupe above commits first
+    concurrently = op.get_bind().dialect.name == 'postgresql'
+    with op.get_context().autocommit_block():
+        op.create_index('uq_shared_passwords_password_id_shared_with_id', 'shared_passwords',
+                        ['password_id', 'shared_with_id'], unique=True,
+                        postgresql_concurrently=concurrently)
+        op.drop_index('ix_shared_passwords_password_id_shared_with_id', table_name='shared_passwords',
+                      postgresql_concurrently=concurrently)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_shared_passwords_password_id_shared_with_id', table_name='shared_passwords')
+    op.create_index('ix_shared_passwords_password_id_shared_with_id', 'shared_passwords',
+                    ['password_id', 'shared_with_id'], unique=False)
@@ -0,0 +1,27 @@
+"""user data version
+
+Revision ID: c71f2d9a4b38
+Revises: 3d9b6e1f7a20
+Create Date: 2026-10-18 16:22:49.170358
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71f2d9a4b38'
+down_revision: Union[str, None] = '3d9b6e1f7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-user version behind the ETags of vault, received-share and profile reads
+    op.add_column('users', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'data_version')
@@ -0,0 +1,64 @@
+"""password search
+
+Revision ID: e4a9b2c6d1f7
+Revises: c71f2d9a4b38
+Create Date: 2026-10-18 18:47:13.925604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9b2c6d1f7'
+down_revision: Union[str, None] = 'c71f2d9a4b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Substring/prefix search over title, username and description
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        with op.get_context().autocommit_block():
+            op.execute(
+                'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_passwords_search_trgm ON passwords USING gin '
+                '(title gin_trgm_ops, username gin_trgm_ops, description gin_trgm_ops)'
+            )
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE passwords_fts USING fts5("
+            "title, username, description, content='passwords', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            "CREATE TRIGGER passwords_fts_ai AFTER INSERT ON passwords BEGIN "
+            "INSERT INTO passwords_fts(rowid, title, username, description) "
+            "VALUES (new.id, new.title, new.username, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER passwords_fts_ad AFTER DELETE ON passwords BEGIN "
+            "INSERT INTO passwords_fts(passwords_fts, rowid, title, username, description) "
+            "VALUES ('delete', old.id, old.title, old.username, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER passwords_fts_au AFTER UPDATE OF title, username, description ON passwords BEGIN "
+            "INSERT INTO passwords_fts(passwords_fts, rowid, title, username, description) "
+            "VALUES ('delete', old.id, old.title, old.username, old.description); "
+            "INSERT INTO passwords_fts(rowid, title, username, description) "
+            "VALUES (new.id, new.title, new.username, new.description); END"
+        )
+        op.execute("INSERT INTO passwords_fts(passwords_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_passwords_search_trgm', table_name='passwords')
+    elif dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS passwords_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS passwords_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS passwords_fts_ai')
+        op.execute('DROP TABLE IF EXISTS passwords_fts')
@@ -1,39 +1,66 @@
+from dataclasses import dataclass
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from pydantic import ValidationError
-from sqlalchemy.orm import Session
-from app.core import security
+from app.core import security, tokens
+from app.core.cache import AccessCache, TTLCache
 from app.core.config import settings
-from app.db.session import get_db
-from app.models.user import User
-from app.schemas.auth import TokenPayload
+from app.db.session import DBSession, get_db
+from app.models.user import User, UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-def get_current_user(
-    db: Session = Depends(get_db),
+@dataclass(frozen=True)
+class Principal:
+    """Detached snapshot of the authenticated user, safe to share between requests."""
+    id: int
+    email: str
+    full_name: Optional[str]
+    role: UserRole
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+        )
+
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL, name="principal"
+)
+
+access_cache = AccessCache(maxsize=settings.ACL_CACHE_SIZE, ttl=settings.ACL_CACHE_TTL, name="acl")
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.invalidate(user_id)
+
+async def get_current_user(
+    db: DBSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> Principal:
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (JWTError, ValidationError):
+        token_data = tokens.verify_access_token(token)
+    except tokens.TokenError:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(User).filter(User.id == token_data.sub).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
-
-def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    principal = principal_cache.get(token_data.sub)
+    if principal is None:
+        user = await db.get(User, token_data.sub) if token_data.sub is not None else None
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal = Principal.from_user(user)
+        principal_cache.set(principal.id, principal)
+    return principal
+
+async def get_current_active_user(
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user 
\ No newline at end of file
+    return current_user
@@ -0,0 +1,108 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Union
+from fastapi import Request, Response
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.sql.expression import Select, SelectBase
+from app.db.session import DBSession
+from app.models.group import GroupMember, GroupShare
+from app.models.password import Password
+from app.models.shared_password import SharedPassword, ShareStatus
+from app.models.user import User
+
+# Vault data may be revalidated by the client but never stored by shared caches
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over everything the representation depends on."""
+    return '"%s"' % hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check; the header uses the weak comparison (RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def share_recipients(*criteria) -> SelectBase:
+    """
+    Recipients of the live shares of the passwords matching ``criteria``,
+    direct or through a group.
+    """
+    direct = (
+        select(SharedPassword.shared_with_id)
+        .join(Password, SharedPassword.password_id == Password.id)
+        .filter(SharedPassword.status == ShareStatus.ACTIVE, *criteria)
+    )
+    via_group = (
+        select(GroupMember.user_id)
+        .join(GroupShare, GroupShare.group_id == GroupMember.group_id)
+        .join(Password, GroupShare.password_id == Password.id)
+        .filter(GroupShare.status == ShareStatus.ACTIVE, *criteria)
+    )
+    return direct.union(via_group)
+
+
+def group_members(group_id: int) -> Select:
+    return select(GroupMember.user_id).filter(GroupMember.group_id == group_id)
+
+
+async def bump_data_version(db: DBSession, *user_ids: Union[int, SelectBase]) -> None:
+    """
+    Invalidate the ETags of the given users (ids, or selects of ids). Call it
+    before the mutation's commit so the bump lands in the same transaction.
+    """
+    await db.execute(
+        update(User)
+        .where(or_(*(User.id.in_(ids) if isinstance(ids, SelectBase) else User.id == ids for ids in user_ids)))
+        # data_version is bookkeeping, not a profile change
+        .values(data_version=User.data_version + 1, updated_at=User.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def vault_version(db: DBSession, user_id: int) -> Any:
+    return await db.scalar(select(User.data_version).where(User.id == user_id))
+
+
+async def received_version(db: DBSession, user_id: int, now: datetime) -> Any:
+    """
+    Version plus the next expiry among the user's live shares, direct and
+    through groups: an expiring share drops out of /received (or
+    /groups/received) without any write, so it must change the ETag on its own.
+    """
+    next_expiry = (
+        select(func.min(SharedPassword.expires_at))
+        .filter(
+            SharedPassword.shared_with_id == user_id,
+            SharedPassword.status == ShareStatus.ACTIVE,
+            SharedPassword.expires_at > now,
+        )
+        .scalar_subquery()
+    )
+    next_group_expiry = (
+        select(func.min(GroupShare.expires_at))
+        .join(GroupMember, GroupMember.group_id == GroupShare.group_id)
+        .filter(
+            GroupMember.user_id == user_id,
+            GroupShare.status == ShareStatus.ACTIVE,
+            GroupShare.expires_at > now,
+        )
+        .scalar_subquery()
+    )
+    result = await db.execute(select(User.data_version, next_expiry, next_group_expiry).where(User.id == user_id))
+    return tuple(result.first() or ())
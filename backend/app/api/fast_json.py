@@ -0,0 +1,50 @@
+"""
+Fast path for list endpoints. With ``response_model`` FastAPI hydrates ORM
+objects and re-validates every one of them (nested owner/recipient included)
+before dumping JSON. The helpers here select just the columns a response
+schema needs and render the rows with orjson, skipping both steps for data
+that came straight from our own tables. Endpoints keep ``response_model`` so
+the OpenAPI schema is unchanged.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Type
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+
+class FastJSONResponse(Response):
+    """orjson-rendered JSON; datetimes and enums come out as Pydantic writes them."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+@lru_cache(maxsize=None)
+def scalar_fields(schema: Type[BaseModel]) -> Tuple[str, ...]:
+    """Fields of ``schema`` that are not nested models, in serialization order."""
+    return tuple(
+        name
+        for name, field in schema.model_fields.items()
+        if not (isinstance(field.annotation, type) and issubclass(field.annotation, BaseModel))
+    )
+
+
+def columns(entity: Any, schema: Type[BaseModel], prefix: str) -> List[Any]:
+    """Labelled columns of ``entity`` (a model or an alias) for the fields of ``schema``."""
+    return [getattr(entity, name).label(prefix + name) for name in scalar_fields(schema)]
+
+
+def row_dict(row: Any, schema: Type[BaseModel], prefix: str) -> Dict[str, Any]:
+    """The ``schema`` fields selected with ``columns(..., prefix)`` from one result row."""
+    mapping = row._mapping
+    return {name: mapping[prefix + name] for name in scalar_fields(schema)}
+
+
+def render(content: Any, response: Response) -> FastJSONResponse:
+    """Final response for ``content``, keeping headers already set on the endpoint's ``response``."""
+    rendered = FastJSONResponse(content)
+    rendered.headers.raw.extend(response.headers.raw)
+    return rendered
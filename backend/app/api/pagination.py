@@ -0,0 +1,68 @@
+import base64
+import json
+from typing import Any, Dict, Optional, Sequence
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(**values: Any) -> str:
+    """Opaque cursor for keyset pagination, e.g. ``encode_cursor(id=42)``."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], *keys: str) -> Optional[Dict[str, Any]]:
+    if cursor is None:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, dict) or any(not isinstance(values.get(k), int) for k in keys):
+            raise ValueError
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def set_next_cursor(
+    response: Response, items: Sequence[Any], limit: int, rank: Optional[int] = None
+) -> None:
+    """
+    Advertise the cursor for the page after ``items`` (objects or dicts keyed
+    on ``id``, plus the last item's ``rank`` for ranked results) in the
+    X-Next-Cursor header. List bodies stay plain JSON arrays, so clients
+    using skip/limit are unaffected. A short page means there is no next page.
+    """
+    if items and len(items) >= limit:
+        last = items[-1]
+        last_id = last["id"] if isinstance(last, dict) else last.id
+        if rank is None:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(id=last_id)
+        else:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rank=rank, id=last_id)
+
+
+def paginate(query, id_column, cursor: Optional[str], skip: int, limit: int, descending: bool = False):
+    """
+    Apply keyset pagination when a cursor is given, otherwise fall back to
+    offset/limit. ``query`` must already be ordered by ``id_column``.
+    """
+    after = decode_cursor(cursor, "id")
+    if after is None:
+        return query.offset(skip).limit(limit)
+    boundary = id_column < after["id"] if descending else id_column > after["id"]
+    return query.filter(boundary).limit(limit)
+
+
+def paginate_ranked(query, rank, id_column, cursor: Optional[str], skip: int, limit: int):
+    """
+    ``paginate`` for results ordered by an integer ``rank`` expression, then
+    ``id_column``, both ascending; the cursor carries both.
+    """
+    after = decode_cursor(cursor, "rank", "id")
+    if after is None:
+        return query.offset(skip).limit(limit)
+    boundary = or_(rank > after["rank"], and_(rank == after["rank"], id_column > after["id"]))
+    return query.filter(boundary).limit(limit)
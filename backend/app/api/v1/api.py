@@ -1,9 +1,10 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, passwords, users, shared_passwords
+from app.api.v1.endpoints import auth, groups, passwords, users, shared_passwords
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(passwords.router, prefix="/passwords", tags=["passwords"])
-api_router.include_router(shared_passwords.router, prefix="/shared-passwords", tags=["shared-passwords"]) 
\ No newline at end of file
+api_router.include_router(shared_passwords.router, prefix="/shared-passwords", tags=["shared-passwords"])
+api_router.include_router(groups.router, prefix="/groups", tags=["groups"]) 
\ No newline at end of file
@@ -2,21 +2,22 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.core import security
+from sqlalchemy import select
+from app.core import hashing, security
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import DBSession, get_db
 from app.models.user import User
 from app.schemas.auth import Token, UserCreate, UserResponse
 
 router = APIRouter()
 
 @router.post("/register", response_model=UserResponse)
-def register(user_in: UserCreate, db: Session = Depends(get_db)) -> Any:
+async def register(user_in: UserCreate, db: DBSession = Depends(get_db)) -> Any:
     """
     Register new user.
     """
-    user = db.query(User).filter(User.email == user_in.email).first()
+    result = await db.execute(select(User).filter(User.email == user_in.email))
+    user = result.scalars().first()
     if user:
         raise HTTPException(
             status_code=400,
@@ -24,24 +25,27 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)) -> Any:
         )
     user = User(
         email=user_in.email,
-        hashed_password=security.get_password_hash(user_in.password),
+        hashed_password=await hashing.get_password_hash(user_in.password),
         full_name=user_in.full_name,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 @router.post("/login", response_model=Token)
-def login(
-    db: Session = Depends(get_db),
+async def login(
+    db: DBSession = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    result = await db.execute(select(User).filter(User.email == form_data.username))
+    user = result.scalars().first()
+    if not user or not await hashing.verify_password(
+        form_data.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -53,4 +57,4 @@ def login(
             {"sub": str(user.id)}, expires_delta=access_token_expires
         ),
         "token_type": "bearer",
-    } 
\ No newline at end of file
+    }
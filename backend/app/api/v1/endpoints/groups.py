@@ -0,0 +1,346 @@
+import logging
+from typing import Any, List, Optional
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.config import settings
+from app.db.session import DBSession, get_db, get_read_db
+from app.models.group import Group, GroupMember, GroupShare
+from app.models.password import Password
+from app.models.shared_password import ShareStatus
+from app.models.user import User
+from app.schemas.group import (
+    GroupCreate,
+    GroupMembersAdd,
+    GroupResponse,
+    GroupShareCreate,
+    GroupShareResult,
+    GroupSharedPasswordResponse,
+)
+from app.schemas.user import UserResponse
+from app.api.deps import Principal, access_cache, get_current_user
+from app.api.fast_json import columns, render, row_dict
+from app.api.etag import (
+    bump_data_version,
+    etag_matches,
+    group_members,
+    make_etag,
+    not_modified,
+    received_version,
+    set_etag,
+)
+from app.api.pagination import paginate, set_next_cursor
+from app.api.v1.endpoints.passwords import password_dict, password_rows
+from app.api.v1.endpoints.shared_passwords import find_user_ids, owned_password_ids, share_upsert
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+async def get_member_group(db: DBSession, group_id: int, user_id: int) -> Group:
+    """The group, if the user is a member; 404 otherwise."""
+    result = await db.execute(
+        select(Group)
+        .join(GroupMember, GroupMember.group_id == Group.id)
+        .filter(Group.id == group_id, GroupMember.user_id == user_id)
+    )
+    group = result.scalars().first()
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return group
+
+async def get_owned_group(db: DBSession, group_id: int, user_id: int) -> Group:
+    group = await get_member_group(db, group_id, user_id)
+    if group.owner_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return group
+
+def group_received_rows(user_id: int, now: datetime):
+    """
+    Passwords with a live share to any of the user's groups, one row per
+    password with the latest expiry. Resolved from the membership join at
+    read time: joining a group needs no per-password rows.
+    """
+    reachable = (
+        select(GroupShare.password_id, func.max(GroupShare.expires_at).label("expires_at"))
+        .join(GroupMember, GroupMember.group_id == GroupShare.group_id)
+        .filter(
+            GroupMember.user_id == user_id,
+            GroupShare.status == ShareStatus.ACTIVE,
+            GroupShare.expires_at > now,
+        )
+        .group_by(GroupShare.password_id)
+        .subquery()
+    )
+    return (
+        password_rows()
+        .add_columns(reachable.c.expires_at.label("group_expires_at"))
+        .join(reachable, reachable.c.password_id == Password.id)
+        # Sharing with your own group does not make it "received"
+        .filter(Password.owner_id != user_id)
+    )
+
+@router.post("/", response_model=GroupResponse)
+async def create_group(
+    *,
+    db: DBSession = Depends(get_db),
+    group_in: GroupCreate,
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    """
+    Create a group owned by the current user, who becomes its first member.
+    """
+    group = Group(name=group_in.name, owner_id=current_user.id)
+    db.add(group)
+    await db.flush()
+    db.add(GroupMember(group_id=group.id, user_id=current_user.id))
+    await db.commit()
+    await db.refresh(group)
+    return group
+
+@router.get("/", response_model=List[GroupResponse])
+async def read_groups(
+    response: Response,
+    db: DBSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Any:
+    """
+    Retrieve the groups the current user belongs to.
+    """
+    query = (
+        select(*columns(Group, GroupResponse, ""))
+        .join(GroupMember, GroupMember.group_id == Group.id)
+        .filter(GroupMember.user_id == current_user.id)
+        .order_by(Group.id)
+    )
+    result = await db.execute(paginate(query, Group.id, cursor, skip, limit))
+    groups = [row_dict(row, GroupResponse, "") for row in result.all()]
+    set_next_cursor(response, groups, limit)
+    return render(groups, response)
+
+@router.get("/received", response_model=List[GroupSharedPasswordResponse])
+async def read_group_received_passwords(
+    request: Request,
+    response: Response,
+    db: DBSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Any:
+    """
+    Retrieve passwords shared with the current user's groups, one entry per
+    password, newest password first. Answers a matching If-None-Match with 304.
+    """
+    now = datetime.now().astimezone()
+    version = await received_version(db, current_user.id, now)
+    etag = make_etag("group-received", current_user.id, version, skip, limit, cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    query = group_received_rows(current_user.id, now).order_by(Password.id.desc())
+    result = await db.execute(paginate(query, Password.id, cursor, skip, limit, descending=True))
+    entries = [
+        {"password_id": row.p_id, "expires_at": row.group_expires_at, "password": password_dict(row)}
+        for row in result.all()
+    ]
+    set_next_cursor(response, [entry["password"] for entry in entries], limit)
+    set_etag(response, etag)
+    return render(entries, response)
+
+@router.delete("/{group_id}")
+async def delete_group(
+    *,
+    db: DBSession = Depends(get_db),
+    group_id: int,
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    """
+    Delete a group with its memberships and shares. Only available for the group owner.
+    """
+    group = await get_owned_group(db, group_id, current_user.id)
+    member_ids = (await db.execute(group_members(group_id))).scalars().all()
+    await bump_data_version(db, group_members(group_id))
+    await db.execute(delete(GroupShare).where(GroupShare.group_id == group_id))
+    await db.execute(delete(GroupMember).where(GroupMember.group_id == group_id))
+    await db.delete(group)
+    await db.commit()
+    for member_id in member_ids:
+        access_cache.invalidate(user_id=member_id)
+    return {"status": "success"}
+
+@router.get("/{group_id}/members", response_model=List[UserResponse])
+async def read_group_members(
+    response: Response,
+    group_id: int,
+    db: DBSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Any:
+    """
+    Retrieve the members of a group the current user belongs to.
+    """
+    await get_member_group(db, group_id, current_user.id)
+    # Driven from the membership primary key (group_id, user_id), already in user order
+    query = (
+        select(*columns(User, UserResponse, ""))
+        .select_from(GroupMember)
+        .join(User, GroupMember.user_id == User.id)
+        .filter(GroupMember.group_id == group_id)
+        .order_by(GroupMember.user_id)
+    )
+    result = await db.execute(paginate(query, GroupMember.user_id, cursor, skip, limit))
+    members = [row_dict(row, UserResponse, "") for row in result.all()]
+    set_next_cursor(response, members, limit)
+    return render(members, response)
+
+@router.post("/{group_id}/members")
+async def add_group_members(
+    *,
+    db: DBSession = Depends(get_db),
+    group_id: int,
+    members_in: GroupMembersAdd,
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    """
+    Add users (by id and/or email) to a group. New members immediately see
+    everything shared with the group; no share rows are written. Only
+    available for the group owner.
+    """
+    # Bounded before any lookup: the IN lists below are as long as the request's
+    if len(set(members_in.user_ids)) + len(set(members_in.emails)) > settings.GROUP_MEMBERS_MAX:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.GROUP_MEMBERS_MAX} members per request"
+        )
+    await get_owned_group(db, group_id, current_user.id)
+    user_ids = await find_user_ids(db, members_in.user_ids, members_in.emails)
+    if not user_ids:
+        raise HTTPException(status_code=400, detail="No users given")
+    insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    added = 0
+    for start in range(0, len(user_ids), settings.SHARE_BULK_CHUNK_SIZE):
+        chunk = user_ids[start:start + settings.SHARE_BULK_CHUNK_SIZE]
+        result = await db.execute(
+            insert(GroupMember)
+            .values([{"group_id": group_id, "user_id": user_id} for user_id in chunk])
+            .on_conflict_do_nothing(index_elements=[GroupMember.group_id, GroupMember.user_id])
+        )
+        added += result.rowcount
+    await bump_data_version(db, select(User.id).filter(User.id.in_(user_ids)))
+    await db.commit()
+    logger.debug("Added group members", extra={"group_id": group_id, "added": added})
+    return {"added": added}
+
+@router.delete("/{group_id}/members/{user_id}")
+async def remove_group_member(
+    *,
+    db: DBSession = Depends(get_db),
+    group_id: int,
+    user_id: int,
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    """
+    Remove a member from a group; access through the group ends at once.
+    Available for the group owner, or for members leaving the group.
+    """
+    group = await get_member_group(db, group_id, current_user.id)
+    if current_user.id not in (group.owner_id, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    if user_id == group.owner_id:
+        raise HTTPException(status_code=400, detail="The group owner cannot leave the group")
+    result = await db.execute(
+        delete(GroupMember).where(GroupMember.group_id == group_id, GroupMember.user_id == user_id)
+    )
+    if not result.rowcount:
+        raise HTTPException(status_code=404, detail="Member not found")
+    await bump_data_version(db, user_id)
+    await db.commit()
+    access_cache.invalidate(user_id=user_id)
+    return {"status": "success"}
+
+@router.post("/{group_id}/shares", response_model=GroupShareResult)
+async def share_passwords_with_group(
+    *,
+    db: DBSession = Depends(get_db),
+    group_id: int,
+    shares_in: GroupShareCreate,
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    """
+    Share the current user's passwords with every member of a group they
+    belong to: one upserted row per password, however large the group.
+    """
+    if len(set(shares_in.password_ids)) > settings.SHARE_BULK_MAX_PAIRS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.SHARE_BULK_MAX_PAIRS} shares per request"
+        )
+    await get_member_group(db, group_id, current_user.id)
+    password_ids = await owned_password_ids(db, shares_in.password_ids, current_user.id)
+    expires_at = datetime.now().astimezone() + timedelta(hours=shares_in.expires_in_hours)
+    rows = [
+        {
+            "password_id": password_id,
+            "group_id": group_id,
+            "status": ShareStatus.ACTIVE,
+            "expires_in_hours": shares_in.expires_in_hours,
+            "expires_at": expires_at,
+        }
+        for password_id in password_ids
+    ]
+    dialect_name = db.bind.dialect.name
+    for start in range(0, len(rows), settings.SHARE_BULK_CHUNK_SIZE):
+        chunk = rows[start:start + settings.SHARE_BULK_CHUNK_SIZE]
+        await db.execute(share_upsert(dialect_name, GroupShare, GroupShare.group_id, chunk))
+    await bump_data_version(db, group_members(group_id))
+    await db.commit()
+    for password_id in password_ids:
+        access_cache.invalidate(password_id=password_id)
+    logger.info(
+        "Shared passwords with group",
+        extra={"user_id": current_user.id, "group_id": group_id, "passwords": len(password_ids)},
+    )
+    return {"shared": len(password_ids), "password_ids": password_ids, "expires_at": expires_at}
+
+@router.post("/{group_id}/shares/{password_id}/revoke")
+async def revoke_group_share(
+    *,
+    db: DBSession = Depends(get_db),
+    group_id: int,
+    password_id: int,
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    """
+    Revoke a password's share with a group. Available for the password
+    owner and the group owner.
+    """
+    result = await db.execute(
+        select(GroupShare)
+        .join(Password, GroupShare.password_id == Password.id)
+        .join(Group, GroupShare.group_id == Group.id)
+        .filter(
+            GroupShare.group_id == group_id,
+            GroupShare.password_id == password_id,
+            or_(Password.owner_id == current_user.id, Group.owner_id == current_user.id),
+        )
+    )
+    group_share = result.scalars().first()
+    if not group_share:
+        raise HTTPException(status_code=404, detail="Shared password not found")
+
+    group_share.status = ShareStatus.REVOKED
+    db.add(group_share)
+    await bump_data_version(db, group_members(group_id))
+    await db.commit()
+    access_cache.invalidate(password_id=password_id)
+    return {"status": "success"}
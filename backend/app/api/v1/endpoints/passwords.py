@@ -1,24 +1,189 @@
-from typing import Any, List
+from typing import Any, Dict, List, Literal, Optional, Tuple
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core import security
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import case, column, delete, insert, literal, or_, select, table, union_all
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import joinedload
+from app.core import security, transfer
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import DBSession, get_db, get_read_db
 from app.models.user import User
+from app.models.group import GroupMember, GroupShare
 from app.models.password import Password
 from app.models.shared_password import SharedPassword, ShareStatus
-from app.schemas.password import PasswordCreate, PasswordUpdate, PasswordResponse
-from app.api.deps import get_current_user
+from app.schemas.password import (
+    PasswordCreate,
+    PasswordDecryptBatch,
+    PasswordDecryptBatchResponse,
+    PasswordImportResult,
+    PasswordUpdate,
+    PasswordResponse,
+)
+from app.schemas.user import UserResponse
+from app.api.deps import Principal, access_cache, get_current_user
+from app.api.fast_json import columns, render, row_dict
+from app.api.etag import (
+    bump_data_version,
+    etag_matches,
+    make_etag,
+    not_modified,
+    set_etag,
+    share_recipients,
+    vault_version,
+)
+from app.api.pagination import paginate, paginate_ranked, set_next_cursor
 
 router = APIRouter()
 
+MAX_REPORTED_IMPORT_ERRORS = 100
+
+# FTS5 trigram queries need at least one full trigram
+FTS_MIN_QUERY_LENGTH = 3
+
+passwords_fts = table("passwords_fts", column("rowid"), column("passwords_fts"))
+
+def password_query():
+    """Password select with the owner joined in for PasswordResponse."""
+    return select(Password).options(joinedload(Password.owner))
+
+def password_rows():
+    """
+    Flat select of the PasswordResponse fields (``p_``) and the owner's
+    (``o_``) for the list endpoints; rows become dicts with ``password_dict``.
+    """
+    return select(
+        *columns(Password, PasswordResponse, "p_"), *columns(User, UserResponse, "o_")
+    ).join(User, Password.owner_id == User.id)
+
+def password_dict(row) -> Dict[str, Any]:
+    return {**row_dict(row, PasswordResponse, "p_"), "owner": row_dict(row, UserResponse, "o_")}
+
+def authorized_ciphertexts(user_id: int, password_ids: List[int], now: datetime):
+    """
+    (id, encrypted_password, expires_at) for each way the user may decrypt
+    one of ``password_ids``: ownership (no expiry), a live direct share, or
+    a live share to one of their groups. One UNION ALL, each branch driven
+    by an index on password_id; rows become grants with ``access_grants``.
+    """
+    owned = select(
+        Password.id, Password.encrypted_password, literal(None, SharedPassword.expires_at.type).label("expires_at")
+    ).filter(Password.id.in_(password_ids), Password.owner_id == user_id)
+    direct = (
+        select(Password.id, Password.encrypted_password, SharedPassword.expires_at)
+        .join(SharedPassword, SharedPassword.password_id == Password.id)
+        .filter(
+            SharedPassword.password_id.in_(password_ids),
+            SharedPassword.shared_with_id == user_id,
+            SharedPassword.status == ShareStatus.ACTIVE,
+            SharedPassword.expires_at > now,
+        )
+    )
+    via_group = (
+        select(Password.id, Password.encrypted_password, GroupShare.expires_at)
+        .join(GroupShare, GroupShare.password_id == Password.id)
+        .join(GroupMember, GroupMember.group_id == GroupShare.group_id)
+        .filter(
+            GroupShare.password_id.in_(password_ids),
+            GroupMember.user_id == user_id,
+            GroupShare.status == ShareStatus.ACTIVE,
+            GroupShare.expires_at > now,
+        )
+    )
+    return union_all(owned, direct, via_group)
+
+def access_grants(rows, now: datetime) -> Dict[int, Tuple[str, Optional[float]]]:
+    """
+    password id -> (ciphertext, seconds the access lasts; None when owned),
+    keeping the longest-lived way in.
+    """
+    grants: Dict[int, Tuple[str, Optional[float]]] = {}
+    for password_id, ciphertext, expires_at in rows:
+        lifetime = None
+        if expires_at is not None:
+            if expires_at.tzinfo is None:  # sqlite hands back the naive local time
+                expires_at = expires_at.replace(tzinfo=now.tzinfo)
+            lifetime = (expires_at - now).total_seconds()
+        current = grants.get(password_id)
+        if current is None or (current[1] is not None and (lifetime is None or lifetime > current[1])):
+            grants[password_id] = (ciphertext, lifetime)
+    return grants
+
+async def authorized_ciphertext_map(db: DBSession, user_id: int, password_ids: List[int]) -> Dict[int, str]:
+    """
+    Ciphertexts of the ``password_ids`` the user may decrypt, served from
+    ``access_cache`` where possible; the rest cost one query, whose grants
+    are cached for no longer than the shares behind them.
+    """
+    ciphertexts: Dict[int, str] = {}
+    missing = []
+    for password_id in password_ids:
+        ciphertext = access_cache.get(user_id, password_id)
+        if ciphertext is None:
+            missing.append(password_id)
+        else:
+            ciphertexts[password_id] = ciphertext
+    if missing:
+        tick = access_cache.begin()
+        now = datetime.now().astimezone()
+        result = await db.execute(authorized_ciphertexts(user_id, missing, now))
+        for password_id, (ciphertext, lifetime) in access_grants(result.all(), now).items():
+            access_cache.set(user_id, password_id, ciphertext, tick, ttl=lifetime)
+            ciphertexts[password_id] = ciphertext
+    return ciphertexts
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def search_condition(dialect_name: str, q: str):
+    """
+    Entries whose title, username or description contain ``q``, ignoring
+    case. Postgres serves the ILIKE from the trigram GIN index; sqlite looks
+    ``q`` up in the FTS5 shadow table when it is long enough for trigrams.
+    """
+    if dialect_name == "sqlite" and len(q) >= FTS_MIN_QUERY_LENGTH:
+        phrase = '"%s"' % q.replace('"', '""')
+        return Password.id.in_(
+            select(passwords_fts.c.rowid).where(passwords_fts.c.passwords_fts.match(phrase))
+        )
+    pattern = "%" + escape_like(q) + "%"
+    return or_(
+        Password.title.ilike(pattern, escape="\\"),
+        Password.username.ilike(pattern, escape="\\"),
+        Password.description.ilike(pattern, escape="\\"),
+    )
+
+def search_rank(q: str):
+    """
+    Match quality, best first: title prefix, username prefix, title
+    substring, username substring, description only.
+    """
+    prefix = escape_like(q) + "%"
+    anywhere = "%" + prefix
+    return case(
+        (Password.title.ilike(prefix, escape="\\"), 0),
+        (Password.username.ilike(prefix, escape="\\"), 1),
+        (Password.title.ilike(anywhere, escape="\\"), 2),
+        (Password.username.ilike(anywhere, escape="\\"), 3),
+        else_=4,
+    )
+
+async def get_owned_password(db: DBSession, password_id: int, owner_id: int) -> Password:
+    result = await db.execute(
+        password_query().filter(Password.id == password_id, Password.owner_id == owner_id)
+    )
+    password = result.scalars().first()
+    if not password:
+        raise HTTPException(status_code=404, detail="Password not found")
+    return password
+
 @router.post("/", response_model=PasswordResponse)
-def create_password(
+async def create_password(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     password_in: PasswordCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Create new password.
@@ -32,87 +197,216 @@ def create_password(
         owner_id=current_user.id,
     )
     db.add(password)
-    db.commit()
-    db.refresh(password)
-    return password
+    await bump_data_version(db, current_user.id)
+    await db.commit()
+    return await get_owned_password(db, password.id, current_user.id)
 
 @router.get("/", response_model=List[PasswordResponse])
-def read_passwords(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def read_passwords(
+    request: Request,
+    response: Response,
+    db: DBSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=200),
 ) -> Any:
     """
-    Retrieve passwords.
+    Retrieve passwords. Pass the X-Next-Cursor header back as ``cursor`` to
+    fetch the next page. Answers a matching If-None-Match with 304.
+
+    With ``q``, only entries whose title, username or description contain it
+    are returned, ranked by ``search_rank`` and then by id.
+    """
+    q = q.strip() if q else None
+    etag = make_etag(
+        "passwords", current_user.id, await vault_version(db, current_user.id), skip, limit, cursor, q
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if q:
+        rank = search_rank(q)
+        query = (
+            password_rows()
+            .add_columns(rank.label("rank"))
+            .filter(Password.owner_id == current_user.id, search_condition(db.bind.dialect.name, q))
+            .order_by(rank, Password.id)
+        )
+        result = await db.execute(paginate_ranked(query, rank, Password.id, cursor, skip, limit))
+        rows = result.all()
+        passwords = [password_dict(row) for row in rows]
+        set_next_cursor(response, passwords, limit, rank=rows[-1].rank if rows else None)
+    else:
+        query = password_rows().filter(Password.owner_id == current_user.id).order_by(Password.id)
+        result = await db.execute(paginate(query, Password.id, cursor, skip, limit))
+        passwords = [password_dict(row) for row in result.all()]
+        set_next_cursor(response, passwords, limit)
+    set_etag(response, etag)
+    return render(passwords, response)
+
+@router.post("/decrypt-batch", response_model=PasswordDecryptBatchResponse)
+async def decrypt_passwords_batch(
+    *,
+    db: DBSession = Depends(get_db),
+    batch_in: PasswordDecryptBatch,
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    """
+    Decrypt several passwords in one request. Ownership and active shares are
+    resolved in a single query (for ids not in the access cache); ids the user cannot read are listed in
+    ``denied`` rather than failing the whole batch.
+    """
+    requested = list(dict.fromkeys(batch_in.ids))
+    ciphertexts = await authorized_ciphertext_map(db, current_user.id, requested)
+    return {
+        "passwords": [
+            {"id": password_id, "password": security.decrypt_password(ciphertexts[password_id])}
+            for password_id in requested if password_id in ciphertexts
+        ],
+        "denied": [password_id for password_id in requested if password_id not in ciphertexts],
+    }
+
+def decrypt_export_rows(rows) -> List[Dict[str, Any]]:
+    return [
+        {
+            "title": row.title,
+            "username": row.username,
+            "password": security.decrypt_password(row.encrypted_password),
+            "description": row.description,
+        }
+        for row in rows
+    ]
+
+@router.get("/export")
+async def export_passwords(
+    db: DBSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+) -> Any:
+    """
+    Stream the whole vault as NDJSON or CSV. Rows are read from a server-side
+    cursor and written chunk by chunk, so memory stays flat for any vault size.
+    """
+    query = (
+        select(Password.title, Password.username, Password.encrypted_password, Password.description)
+        .filter(Password.owner_id == current_user.id)
+        .order_by(Password.id)
+    )
+
+    async def body():
+        if export_format == "csv":
+            yield transfer.csv_header()
+        result = await db.stream(query)
+        async for rows in result.partitions(settings.EXPORT_CHUNK_SIZE):
+            entries = await run_in_threadpool(decrypt_export_rows, rows)
+            yield transfer.format_entries(entries, export_format)
+
+    return StreamingResponse(
+        body(),
+        media_type=transfer.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="vault.{export_format}"'},
+    )
+
+def encrypt_import_chunk(entries: List[PasswordCreate], owner_id: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "title": entry.title,
+            "username": entry.username,
+            "encrypted_password": security.encrypt_password(entry.password),
+            "description": entry.description,
+            "owner_id": owner_id,
+            "is_active": True,
+        }
+        for entry in entries
+    ]
+
+@router.post("/import", response_model=PasswordImportResult)
+async def import_passwords(
+    request: Request,
+    db: DBSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    import_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+) -> Any:
     """
-    passwords = db.query(Password).filter(Password.owner_id == current_user.id).offset(skip).limit(limit).all()
-    return passwords
+    Bulk import from an NDJSON or CSV request body (the export format). The
+    body is parsed as it streams in; entries are encrypted and inserted with
+    one multi-row INSERT and one commit per chunk. Invalid lines are skipped
+    and reported.
+    """
+    imported = failed = 0
+    chunks: List[Dict[str, int]] = []
+    errors: List[Dict[str, Any]] = []
+    pending: List[PasswordCreate] = []
+
+    async def flush() -> None:
+        nonlocal imported
+        rows = await run_in_threadpool(encrypt_import_chunk, pending, current_user.id)
+        await db.execute(insert(Password), rows)
+        await bump_data_version(db, current_user.id)
+        await db.commit()
+        imported += len(rows)
+        chunks.append({"chunk": len(chunks) + 1, "imported": len(rows), "total": imported})
+        pending.clear()
+
+    async for line, record in transfer.iter_records(
+        request.stream(), import_format, settings.IMPORT_MAX_RECORD_BYTES
+    ):
+        try:
+            if isinstance(record, ValueError):
+                raise record
+            pending.append(PasswordCreate(**record))
+        except (ValueError, ValidationError) as exc:
+            failed += 1
+            if len(errors) < MAX_REPORTED_IMPORT_ERRORS:
+                errors.append({"line": line, "detail": str(exc)})
+            continue
+        if len(pending) >= settings.IMPORT_CHUNK_SIZE:
+            await flush()
+    if pending:
+        await flush()
+    return {"imported": imported, "failed": failed, "chunks": chunks, "errors": errors}
 
 @router.get("/{password_id}", response_model=PasswordResponse)
-def read_password(
+async def read_password(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_read_db),
     password_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Get password by ID.
     """
-    password = db.query(Password).filter(Password.id == password_id, Password.owner_id == current_user.id).first()
-    if not password:
-        raise HTTPException(status_code=404, detail="Password not found")
-    return password
+    return await get_owned_password(db, password_id, current_user.id)
 
 @router.get("/{password_id}/decrypt")
-def decrypt_password(
+async def decrypt_password(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     password_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Decrypt password by ID. Available for password owner or users with shared access.
+    Resolved in one query, or none while the access cache holds the grant.
     """
-    # First check if user owns the password
-    password = db.query(Password).filter(
-        Password.id == password_id,
-        Password.owner_id == current_user.id
-    ).first()
-
-    # If user doesn't own the password, check if it's shared with them
-    if not password:
-        shared_password = db.query(SharedPassword).filter(
-            SharedPassword.password_id == password_id,
-            SharedPassword.shared_with_id == current_user.id,
-            SharedPassword.status == ShareStatus.ACTIVE,
-            SharedPassword.expires_at > datetime.now().astimezone()
-        ).first()
-        
-        if not shared_password:
-            raise HTTPException(status_code=404, detail="Password not found or access denied")
-        
-        password = db.query(Password).filter(Password.id == password_id).first()
-        if not password:
-            raise HTTPException(status_code=404, detail="Password not found")
-    
-    decrypted_password = security.decrypt_password(password.encrypted_password)
-    return {"password": decrypted_password}
+    ciphertexts = await authorized_ciphertext_map(db, current_user.id, [password_id])
+    if password_id not in ciphertexts:
+        raise HTTPException(status_code=404, detail="Password not found or access denied")
+    return {"password": security.decrypt_password(ciphertexts[password_id])}
 
 @router.put("/{password_id}", response_model=PasswordResponse)
-def update_password(
+async def update_password(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     password_id: int,
     password_in: PasswordUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Update password.
     """
-    password = db.query(Password).filter(Password.id == password_id, Password.owner_id == current_user.id).first()
-    if not password:
-        raise HTTPException(status_code=404, detail="Password not found")
+    password = await get_owned_password(db, password_id, current_user.id)
     
     if password_in.password:
         password.encrypted_password = security.encrypt_password(password_in.password)
@@ -122,24 +416,31 @@ def update_password(
         password.description = password_in.description
     
     db.add(password)
-    db.commit()
-    db.refresh(password)
-    return password
+    await bump_data_version(db, current_user.id, share_recipients(Password.id == password_id))
+    await db.commit()
+    access_cache.invalidate(password_id=password_id)
+    return await get_owned_password(db, password_id, current_user.id)
 
 @router.delete("/{password_id}")
-def delete_password(
+async def delete_password(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     password_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Delete password.
     """
-    password = db.query(Password).filter(Password.id == password_id, Password.owner_id == current_user.id).first()
+    result = await db.execute(
+        select(Password).filter(Password.id == password_id, Password.owner_id == current_user.id)
+    )
+    password = result.scalars().first()
     if not password:
         raise HTTPException(status_code=404, detail="Password not found")
     
-    db.delete(password)
-    db.commit()
-    return {"status": "success"} 
\ No newline at end of file
+    await bump_data_version(db, current_user.id, share_recipients(Password.id == password_id))
+    await db.execute(delete(GroupShare).where(GroupShare.password_id == password_id))
+    await db.delete(password)
+    await db.commit()
+    access_cache.invalidate(password_id=password_id)
+    return {"status": "success"}
@@ -1,162 +1,374 @@
-from typing import Any, List
+import logging
+from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import aliased, joinedload
 from app.core import security
 from app.core.config import settings
-from app.db.session import get_db
-from app.models.user import User
+from app.db.session import DBSession, get_db, get_read_db
+from app.models.user import User, UserRole
 from app.models.password import Password
 from app.models.shared_password import SharedPassword, ShareStatus
-from app.schemas.shared_password import SharedPasswordCreate, SharedPasswordResponse
-from app.api.deps import get_current_user
+from app.schemas.password import PasswordResponse
+from app.schemas.shared_password import (
+    SharedPasswordBulkCreate,
+    SharedPasswordBulkResult,
+    SharedPasswordCreate,
+    SharedPasswordResponse,
+)
+from app.schemas.user import UserResponse
+from app.api.deps import Principal, access_cache, get_current_active_user, get_current_user
+from app.api.fast_json import columns, render, row_dict
+from app.api.etag import bump_data_version, etag_matches, make_etag, not_modified, received_version, set_etag
+from app.api.pagination import paginate, set_next_cursor
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+def shared_password_query():
+    """
+    SharedPassword select with everything SharedPasswordResponse nests
+    (password, its owner, the recipient) joined in, so a page of shares
+    serializes without a single lazy load.
+    """
+    return select(SharedPassword).options(
+        joinedload(SharedPassword.password).joinedload(Password.owner),
+        joinedload(SharedPassword.shared_with),
+    )
+
+def shared_password_rows():
+    """
+    Flat select of the SharedPasswordResponse fields (``s_``), the password
+    (``p_``), its owner (``o_``) and the recipient (``r_``) for the list
+    endpoints; rows become dicts with ``shared_password_dict``.
+    """
+    owner = aliased(User)
+    recipient = aliased(User)
+    return (
+        select(
+            *columns(SharedPassword, SharedPasswordResponse, "s_"),
+            *columns(Password, PasswordResponse, "p_"),
+            *columns(owner, UserResponse, "o_"),
+            *columns(recipient, UserResponse, "r_"),
+        )
+        .join(Password, SharedPassword.password_id == Password.id)
+        .join(owner, Password.owner_id == owner.id)
+        .join(recipient, SharedPassword.shared_with_id == recipient.id)
+    )
+
+def shared_password_dict(row) -> Dict[str, Any]:
+    return {
+        **row_dict(row, SharedPasswordResponse, "s_"),
+        "password": {**row_dict(row, PasswordResponse, "p_"), "owner": row_dict(row, UserResponse, "o_")},
+        "shared_with": row_dict(row, UserResponse, "r_"),
+    }
+
+def share_upsert(dialect_name: str, model: Any, recipient: Any, rows: List[Dict[str, Any]]):
+    """
+    Multi-row INSERT of shares (``SharedPassword`` or ``GroupShare`` rows)
+    that, for a password already shared with the ``recipient`` column's
+    user or group, re-activates that share instead and keeps the later of
+    the two expiries (an expired or revoked share takes the new one).
+    """
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = insert(model).values(rows)
+    excluded = statement.excluded
+    keep_current = and_(model.status == ShareStatus.ACTIVE, model.expires_at > excluded.expires_at)
+    return statement.on_conflict_do_update(
+        index_elements=[model.password_id, recipient],
+        set_={
+            "status": ShareStatus.ACTIVE,
+            "expires_at": case((keep_current, model.expires_at), else_=excluded.expires_at),
+            "expires_in_hours": case((keep_current, model.expires_in_hours), else_=excluded.expires_in_hours),
+            "updated_at": func.now(),
+        },
+    )
+
+async def owned_password_ids(db: DBSession, password_ids: List[int], owner_id: int) -> List[int]:
+    """``password_ids`` deduplicated and sorted, after one query checking they are all the owner's."""
+    password_ids = sorted(set(password_ids))
+    result = await db.execute(
+        select(Password.id).filter(Password.id.in_(password_ids), Password.owner_id == owner_id)
+    )
+    missing = sorted(set(password_ids) - set(result.scalars().all()))
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Passwords not found: {missing}")
+    return password_ids
+
+async def find_user_ids(db: DBSession, user_ids: List[int], emails: List[str]) -> List[int]:
+    """Ids of the users named by id or email, in one query; 404 listing any that do not exist."""
+    wanted_ids, wanted_emails = set(user_ids), set(emails)
+    if not wanted_ids and not wanted_emails:
+        return []
+    result = await db.execute(
+        select(User.id, User.email).filter(or_(User.id.in_(wanted_ids), User.email.in_(wanted_emails)))
+    )
+    users = result.all()
+    missing = sorted(map(str, wanted_ids - {u.id for u in users})) + sorted(wanted_emails - {u.email for u in users})
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Users not found: {missing}")
+    return sorted({u.id for u in users})
+
+def share_row(password_id: int, shared_with_id: int, expires_in_hours: int, expires_at: datetime) -> Dict[str, Any]:
+    return {
+        "password_id": password_id,
+        "shared_with_id": shared_with_id,
+        "status": ShareStatus.ACTIVE,
+        "expires_in_hours": expires_in_hours,
+        "expires_at": expires_at,
+    }
+
 @router.post("/", response_model=SharedPasswordResponse)
-def share_password(
+async def share_password(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     shared_password_in: SharedPasswordCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
-    Share password with another user.
+    Share password with another user. Sharing it again with the same user
+    re-activates the existing share and extends its expiry.
     """
-    print(f"Attempting to share password {shared_password_in.password_id} with user {shared_password_in.shared_with_id}")
+    logger.debug(
+        "Sharing password",
+        extra={"password_id": shared_password_in.password_id, "shared_with_id": shared_password_in.shared_with_id},
+    )
     
     # Check if password exists and belongs to current user
-    password = db.query(Password).filter(
-        Password.id == shared_password_in.password_id,
-        Password.owner_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Password).filter(
+            Password.id == shared_password_in.password_id,
+            Password.owner_id == current_user.id
+        )
+    )
+    password = result.scalars().first()
     if not password:
-        print(f"Password {shared_password_in.password_id} not found or not owned by user {current_user.id}")
+        logger.debug(
+            "Password not found or not owned by user",
+            extra={"password_id": shared_password_in.password_id, "user_id": current_user.id},
+        )
         raise HTTPException(status_code=404, detail="Password not found")
 
     # Check if user exists
-    shared_with_user = db.query(User).filter(User.id == shared_password_in.shared_with_id).first()
+    shared_with_user = await db.get(User, shared_password_in.shared_with_id)
     if not shared_with_user:
-        print(f"User {shared_password_in.shared_with_id} not found")  # Debug log
+        logger.debug("Share recipient not found", extra={"shared_with_id": shared_password_in.shared_with_id})
         raise HTTPException(status_code=404, detail="User not found")
 
-    print(f"Found user {shared_with_user.email} to share with")  # Debug log
-
-    # Create shared password with timezone-aware datetime
+    # Create or extend the share with a timezone-aware expiry
     expires_at = datetime.now().astimezone() + timedelta(hours=shared_password_in.expires_in_hours)
-    shared_password = SharedPassword(
-        password_id=shared_password_in.password_id,
-        shared_with_id=shared_password_in.shared_with_id,
-        expires_at=expires_at,
-        status=ShareStatus.ACTIVE,
-        expires_in_hours=shared_password_in.expires_in_hours
-    )
-    db.add(shared_password)
-    db.commit()
-    db.refresh(shared_password)
+    row = share_row(password.id, shared_with_user.id, shared_password_in.expires_in_hours, expires_at)
+    await db.execute(share_upsert(db.bind.dialect.name, SharedPassword, SharedPassword.shared_with_id, [row]))
+    await bump_data_version(db, shared_with_user.id)
+    await db.commit()
+    access_cache.invalidate(shared_with_user.id, password.id)
     
-    print(f"Successfully shared password {password.title} with {shared_with_user.email}")  # Debug log
+    result = await db.execute(
+        shared_password_query()
+        .filter(SharedPassword.password_id == password.id, SharedPassword.shared_with_id == shared_with_user.id)
+        .execution_options(populate_existing=True)
+    )
+    shared_password = result.scalars().one()
+    logger.debug(
+        "Shared password",
+        extra={"shared_password_id": shared_password.id, "password_id": password.id, "shared_with_id": shared_with_user.id},
+    )
     return shared_password
 
+@router.post("/bulk", response_model=SharedPasswordBulkResult)
+async def share_passwords_bulk(
+    *,
+    db: DBSession = Depends(get_db),
+    shares_in: SharedPasswordBulkCreate,
+    current_user: Principal = Depends(get_current_user),
+) -> Any:
+    """
+    Share every listed password with every listed recipient (by id and/or
+    email) in one transaction. Ownership and recipients are checked with one
+    query each; all shares are written with multi-row upserts, so existing
+    shares are re-activated and extended rather than duplicated.
+    """
+    # Bounded before any lookup: the IN lists below are as long as the request's
+    recipients = len(set(shares_in.shared_with_ids)) + len(set(shares_in.shared_with_emails))
+    if not recipients:
+        raise HTTPException(status_code=400, detail="No recipients given")
+    pairs = len(set(shares_in.password_ids)) * recipients
+    if pairs > settings.SHARE_BULK_MAX_PAIRS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.SHARE_BULK_MAX_PAIRS} shares per request, got {pairs}"
+        )
+
+    password_ids = await owned_password_ids(db, shares_in.password_ids, current_user.id)
+    recipient_ids = await find_user_ids(db, shares_in.shared_with_ids, shares_in.shared_with_emails)
+    # An id and an email can name the same user
+    pairs = len(password_ids) * len(recipient_ids)
+
+    expires_at = datetime.now().astimezone() + timedelta(hours=shares_in.expires_in_hours)
+    rows = [
+        share_row(password_id, recipient_id, shares_in.expires_in_hours, expires_at)
+        for password_id in password_ids
+        for recipient_id in recipient_ids
+    ]
+    # Chunked only to stay under the drivers' bind-parameter limits; one transaction
+    dialect_name = db.bind.dialect.name
+    for start in range(0, len(rows), settings.SHARE_BULK_CHUNK_SIZE):
+        chunk = rows[start:start + settings.SHARE_BULK_CHUNK_SIZE]
+        await db.execute(share_upsert(dialect_name, SharedPassword, SharedPassword.shared_with_id, chunk))
+    await bump_data_version(db, select(User.id).filter(User.id.in_(recipient_ids)))
+    await db.commit()
+    for password_id in password_ids:
+        access_cache.invalidate(password_id=password_id)
+    logger.info(
+        "Bulk shared passwords",
+        extra={"user_id": current_user.id, "passwords": len(password_ids), "recipients": len(recipient_ids)},
+    )
+    return {
+        "shared": pairs,
+        "password_ids": password_ids,
+        "shared_with_ids": recipient_ids,
+        "expires_at": expires_at,
+    }
+
 @router.get("/received", response_model=List[SharedPasswordResponse])
-def read_received_passwords(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def read_received_passwords(
+    request: Request,
+    response: Response,
+    db: DBSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
-    Retrieve passwords shared with the current user.
+    Retrieve passwords shared with the current user, newest first. A
+    password has at most one share per recipient, so every live share is one
+    entry. Answers a matching If-None-Match with 304.
     """
-    # Get all active shares for the current user
-    shared_passwords = (
-        db.query(SharedPassword)
-        .join(Password, SharedPassword.password_id == Password.id)
-        .join(User, Password.owner_id == User.id)  # Join with User table to get sender info
+    now = datetime.now().astimezone()
+    version = await received_version(db, current_user.id, now)
+    etag = make_etag("received", current_user.id, version, skip, limit, cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    query = (
+        shared_password_rows()
         .filter(
             SharedPassword.shared_with_id == current_user.id,
             SharedPassword.status == ShareStatus.ACTIVE,
-            SharedPassword.expires_at > datetime.now().astimezone()
+            SharedPassword.expires_at > now,
         )
-        .order_by(SharedPassword.created_at.desc())  # Order by most recent first
-        .all()
+        .order_by(SharedPassword.id.desc())  # Most recent first; ids follow creation order
     )
-    
-    # Create a dictionary to store the most recent share for each password
-    latest_shares = {}
-    for sp in shared_passwords:
-        if sp.password_id not in latest_shares or sp.created_at > latest_shares[sp.password_id].created_at:
-            latest_shares[sp.password_id] = sp
-    
-    # Convert back to list
-    unique_shares = list(latest_shares.values())
-    
-    # Debug logging
-    for sp in unique_shares:
-        print(f"Found shared password: {sp.password.title} shared by {sp.password.owner.full_name}")
-        print(f"Password owner details: {sp.password.owner.__dict__}")
-    
-    return unique_shares
+    result = await db.execute(paginate(query, SharedPassword.id, cursor, skip, limit, descending=True))
+    shared_passwords = [shared_password_dict(row) for row in result.all()]
+    set_next_cursor(response, shared_passwords, limit)
+    set_etag(response, etag)
+    return render(shared_passwords, response)
 
 @router.get("/shared", response_model=List[SharedPasswordResponse])
-def read_shared_passwords(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def read_shared_passwords(
+    response: Response,
+    db: DBSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve passwords shared by current user.
     """
-    shared_passwords = db.query(SharedPassword).join(Password).filter(
-        Password.owner_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return shared_passwords
+    query = (
+        shared_password_rows()
+        .filter(Password.owner_id == current_user.id)
+        .order_by(SharedPassword.id)
+    )
+    result = await db.execute(paginate(query, SharedPassword.id, cursor, skip, limit))
+    shared_passwords = [shared_password_dict(row) for row in result.all()]
+    set_next_cursor(response, shared_passwords, limit)
+    return render(shared_passwords, response)
 
 @router.post("/{shared_password_id}/revoke")
-def revoke_shared_password(
+async def revoke_shared_password(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     shared_password_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Any:
     """
     Revoke shared password access.
     """
-    shared_password = db.query(SharedPassword).join(Password).filter(
-        SharedPassword.id == shared_password_id,
-        Password.owner_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(SharedPassword).join(Password).filter(
+            SharedPassword.id == shared_password_id,
+            Password.owner_id == current_user.id
+        )
+    )
+    shared_password = result.scalars().first()
     if not shared_password:
         raise HTTPException(status_code=404, detail="Shared password not found")
     
     shared_password.status = ShareStatus.REVOKED
     db.add(shared_password)
-    db.commit()
+    await bump_data_version(db, shared_password.shared_with_id)
+    await db.commit()
+    access_cache.invalidate(shared_password.shared_with_id, shared_password.password_id)
     return {"status": "success"} 
 
 @router.get("/count")
-def get_shared_passwords_count(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_shared_passwords_count(
+    current_user: Principal = Depends(get_current_user),
+    db: DBSession = Depends(get_read_db)
 ) -> int:
     """
-    Get count of passwords shared with the current user
+    Get count of passwords shared with the current user (live shares only,
+    matching the entries /received returns)
     """
-    print(f"Getting shared passwords count for user {current_user.id}")
-    count = db.query(SharedPassword).filter(
-        SharedPassword.shared_with_id == current_user.id
-    ).count()
-    print(f"Found {count} shared passwords")
+    count = await db.scalar(
+        select(func.count(func.distinct(SharedPassword.password_id))).filter(
+            SharedPassword.shared_with_id == current_user.id,
+            SharedPassword.status == ShareStatus.ACTIVE,
+            SharedPassword.expires_at > datetime.now().astimezone(),
+        )
+    )
+    logger.debug("Counted shared passwords", extra={"user_id": current_user.id, "count": count})
     return count
 
+@router.get("/expiry-sweeper")
+async def get_expiry_sweeper_stats(
+    request: Request,
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Settings and last-run statistics of this worker's share-expiry sweeper.
+    Only available for admin users.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    # Created by the lifespan; absent when the app is served without it
+    sweeper = getattr(request.app.state, "share_expiry_sweeper", None)
+    if sweeper is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Share expiry sweeper is not running"
+        )
+    return sweeper.snapshot()
+
 @router.get("/", response_model=List[SharedPasswordResponse])
-def get_shared_passwords(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_shared_passwords(
+    current_user: Principal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """
     Get all passwords shared with the current user
     """
-    shared_passwords = db.query(SharedPassword).filter(
-        SharedPassword.user_id == current_user.id
-    ).all()
-    return shared_passwords
\ No newline at end of file
+    result = await db.execute(
+        shared_password_query().filter(
+            SharedPassword.shared_with_id == current_user.id
+        )
+    )
+    return result.scalars().all()
@@ -1,30 +1,46 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core import security
+from dataclasses import astuple
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import delete, or_, select
+from app.core import hashing, security
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import DBSession, get_db
+from app.db.slow_queries import slow_query_log
+from app.models.group import Group, GroupMember, GroupShare
+from app.models.password import Password
 from app.models.user import User, UserRole
 from app.schemas.auth import UserResponse, UserUpdate
-from app.api.deps import get_current_user, get_current_active_user
+from app.api.deps import Principal, access_cache, get_current_user, get_current_active_user, invalidate_principal
+from app.api.fast_json import columns, render, row_dict
+from app.api.etag import bump_data_version, etag_matches, make_etag, not_modified, set_etag, share_recipients
+from app.api.pagination import paginate, set_next_cursor
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
-def read_user_me(
-    current_user: User = Depends(get_current_active_user),
+async def read_user_me(
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """
-    Get current user.
+    Get current user. The ETag is taken from the principal itself, so it
+    always describes the body it comes with.
     """
+    etag = make_etag("me", *astuple(current_user))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return current_user
 
 @router.get("/", response_model=List[UserResponse])
-def read_users(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+async def read_users(
+    response: Response,
+    db: DBSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve users. Only available for admin users.
@@ -34,14 +50,33 @@ def read_users(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    query = select(*columns(User, UserResponse, "")).order_by(User.id)
+    result = await db.execute(paginate(query, User.id, cursor, skip, limit))
+    users = [row_dict(row, UserResponse, "") for row in result.all()]
+    set_next_cursor(response, users, limit)
+    return render(users, response)
+
+@router.get("/slow-queries")
+async def read_slow_queries(
+    current_user: Principal = Depends(get_current_active_user),
+) -> Any:
+    """
+    Recent slow statements seen by this worker, newest first, with redacted
+    parameters, originating route and captured plan. Only available for
+    admin users.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return slow_query_log.snapshot()
 
 @router.get("/{user_id}", response_model=UserResponse)
-def read_user_by_id(
+async def read_user_by_id(
     user_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+    db: DBSession = Depends(get_db),
 ) -> Any:
     """
     Get a specific user by id. Only available for admin users or the user themselves.
@@ -51,53 +86,60 @@ def read_user_by_id(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 @router.get("/by-email/{email}", response_model=UserResponse)
-def read_user_by_email(
+async def read_user_by_email(
     email: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+    db: DBSession = Depends(get_db),
 ) -> Any:
     """
     Get a user by email. Available for all authenticated users.
     """
-    user = db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).filter(User.email == email))
+    user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 @router.put("/me", response_model=UserResponse)
-def update_user_me(
+async def update_user_me(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     user_in: UserUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """
     Update own user.
     """
+    user = await db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
     if user_in.password is not None:
-        current_user.hashed_password = security.get_password_hash(user_in.password)
+        user.hashed_password = await hashing.get_password_hash(user_in.password)
     if user_in.full_name is not None:
-        current_user.full_name = user_in.full_name
+        user.full_name = user_in.full_name
     if user_in.email is not None:
-        current_user.email = user_in.email
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+        user.email = user_in.email
+    db.add(user)
+    # The profile is embedded as owner in the vault and in received shares
+    await bump_data_version(db, user.id, share_recipients(Password.owner_id == user.id))
+    await db.commit()
+    invalidate_principal(user.id)
+    await db.refresh(user)
+    return user
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     user_id: int,
     user_in: UserUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """
     Update a user. Only available for admin users.
@@ -107,26 +149,29 @@ def update_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if user_in.password is not None:
-        user.hashed_password = security.get_password_hash(user_in.password)
+        user.hashed_password = await hashing.get_password_hash(user_in.password)
     if user_in.full_name is not None:
         user.full_name = user_in.full_name
     if user_in.email is not None:
         user.email = user_in.email
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    # The profile is embedded as owner in the vault and in received shares
+    await bump_data_version(db, user.id, share_recipients(Password.owner_id == user.id))
+    await db.commit()
+    invalidate_principal(user.id)
+    await db.refresh(user)
     return user
 
 @router.delete("/{user_id}")
-def delete_user(
+async def delete_user(
     *,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_db),
     user_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ) -> Any:
     """
     Delete a user. Only available for admin users.
@@ -136,9 +181,33 @@ def delete_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    db.delete(user)
-    db.commit()
+    owned_groups = select(Group.id).filter(Group.owner_id == user_id)
+    await bump_data_version(
+        db,
+        share_recipients(Password.owner_id == user_id),
+        select(GroupMember.user_id).filter(GroupMember.group_id.in_(owned_groups)),
+    )
+    # Groups go with their owner; the user's passwords leave every group
+    await db.execute(
+        delete(GroupShare).where(
+            or_(
+                GroupShare.group_id.in_(owned_groups),
+                GroupShare.password_id.in_(select(Password.id).filter(Password.owner_id == user_id)),
+            )
+        ).execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(GroupMember)
+        .where(or_(GroupMember.user_id == user_id, GroupMember.group_id.in_(owned_groups)))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(delete(Group).where(Group.owner_id == user_id).execution_options(synchronize_session=False))
+    await db.delete(user)
+    await db.commit()
+    invalidate_principal(user_id)
+    # Their passwords and groups fanned out to many users; rare enough to drop every grant
+    access_cache.clear()
     return {"status": "success"} 
\ No newline at end of file
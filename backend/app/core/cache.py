@@ -0,0 +1,151 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from app.core import metrics
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a TTL. Entries can
+    carry a shorter lifetime than the cache default (for example a token's
+    own expiry). Hit/miss counters are kept locally and, when the cache has a
+    ``name``, published as ``cache_requests_total``.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._hit_counter = metrics.CACHE_REQUESTS.labels(name, "hit") if name else None
+        self._miss_counter = metrics.CACHE_REQUESTS.labels(name, "miss") if name else None
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[1] <= now:
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                if self._miss_counter is not None:
+                    self._miss_counter.inc()
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            if self._hit_counter is not None:
+                self._hit_counter.inc()
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+class AccessCache:
+    """
+    Decrypt grants per (user_id, password_id), holding the ciphertext so a
+    repeated reveal needs no query. A grant never outlives the share behind
+    it. Invalidation works per pair, per password or per user, and also
+    covers grants read from the database while it happened: callers take a
+    ``begin()`` tick before querying and a grant older than a matching
+    invalidation is neither stored nor served. Other worker processes see
+    a change once their entry expires.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._grants = TTLCache(maxsize, ttl, name=name)
+        # scope -> (tick, monotonic deadline); only needed while older grants may be cached
+        self._invalidated: Dict[Hashable, Tuple[int, float]] = {}
+        self._ticks = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def begin(self) -> int:
+        return next(self._ticks)
+
+    def _stale(self, tick: int, user_id: int, password_id: int) -> bool:
+        now = time.monotonic()
+        for scope in (("user", user_id), ("password", password_id), (user_id, password_id), "all"):
+            invalidated = self._invalidated.get(scope)
+            if invalidated is not None and invalidated[0] >= tick and invalidated[1] > now:
+                return True
+        return False
+
+    def get(self, user_id: int, password_id: int) -> Optional[str]:
+        entry = self._grants.get((user_id, password_id))
+        if entry is None:
+            return None
+        ciphertext, tick = entry
+        if self._stale(tick, user_id, password_id):
+            self._grants.invalidate((user_id, password_id))
+            return None
+        return ciphertext
+
+    def set(
+        self, user_id: int, password_id: int, ciphertext: str, tick: int, ttl: Optional[float] = None
+    ) -> None:
+        if not self._stale(tick, user_id, password_id):
+            self._grants.set((user_id, password_id), (ciphertext, tick), ttl=ttl)
+
+    def invalidate(self, user_id: Optional[int] = None, password_id: Optional[int] = None) -> None:
+        if user_id is not None and password_id is not None:
+            scope: Hashable = (user_id, password_id)
+        elif user_id is not None:
+            scope = ("user", user_id)
+        elif password_id is not None:
+            scope = ("password", password_id)
+        else:
+            scope = "all"
+        now = time.monotonic()
+        with self._lock:
+            if len(self._invalidated) >= self.maxsize:
+                self._invalidated = {
+                    key: value for key, value in self._invalidated.items() if value[1] > now
+                }
+            if len(self._invalidated) >= self.maxsize:
+                # Still full: forget every grant rather than one invalidation
+                self._invalidated.clear()
+                scope = "all"
+            self._invalidated[scope] = (next(self._ticks), now + self.ttl)
+
+    def clear(self) -> None:
+        self.invalidate()
+        self._grants.clear()
+
+    def __len__(self) -> int:
+        return len(self._grants)
+
+    def stats(self) -> Dict[str, int]:
+        return self._grants.stats()
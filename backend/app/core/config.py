@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl
 import os
@@ -6,6 +6,15 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def async_url(url: str) -> str:
+    """The asyncpg/aiosqlite form of a sync database URL."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Opium"
     API_V1_STR: str = "/api/v1"
@@ -22,17 +31,114 @@ class Settings(BaseSettings):
     DB_PASSWORD: str
     DB_NAME: str
     
+    # Async engine (asyncpg / aiosqlite). When disabled, endpoints run the
+    # sync engine through the threadpool adapter in app.db.session.
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    
+    # Connection pool, per engine and worker process: keep
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below max_connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 keeps connections forever
+    # "always" pings on every checkout, "idle" only connections idle for
+    # longer than DB_POOL_PRE_PING_IDLE seconds, "never" relies on recycle
+    DB_POOL_PRE_PING: Literal["always", "idle", "never"] = "idle"
+    DB_POOL_PRE_PING_IDLE: float = 30
+    # Behind PgBouncer (transaction pooling): no app-side pool and no
+    # asyncpg statement caches; PgBouncer does the pooling
+    DB_PGBOUNCER: bool = False
+    
+    # Read replicas (comma separated URLs) serving the read-only endpoints;
+    # empty sends everything to the primary
+    DB_REPLICA_URLS: str = ""
+    # After a commit, the client's reads stay on the primary this long so it
+    # sees its own writes; keep it above the usual replication lag. Across
+    # workers this needs the db_primary_until cookie back: for cross-origin
+    # bearer-token clients it only holds within the worker that wrote
+    DB_REPLICA_STICKY_SECONDS: float = 5
+    # A replica that failed is skipped this long before being tried again
+    DB_REPLICA_RETRY_AFTER: float = 30
+    
     @property
     def SQLALCHEMY_DATABASE_URL(self) -> str:
         return self.DATABASE_URL
     
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URL(self) -> str:
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        return async_url(self.DATABASE_URL)
+    
+    @property
+    def REPLICA_URLS(self) -> List[str]:
+        return [url.strip() for url in self.DB_REPLICA_URLS.split(",") if url.strip()]
+    
     # JWT
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    JWT_BACKEND: str = "jose"  # or "pyjwt"
+    # Verified-token cache; entries never outlive the token's exp
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: int = 300
+    
+    # Authenticated principal cache (per worker process)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 60
+    
+    # Decrypt access cache (per worker process); bounds how long a revoke
+    # takes to reach other workers
+    ACL_CACHE_SIZE: int = 10000
+    ACL_CACHE_TTL: int = 10
+    
+    # Password hashing pool (0 workers runs bcrypt in the threadpool)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32
+    PASSWORD_HASH_RETRY_AFTER: int = 1
+    
+    # Background share-expiry sweeper
+    SHARE_SWEEP_ENABLED: bool = True
+    SHARE_SWEEP_INTERVAL: int = 60  # seconds
+    SHARE_SWEEP_BATCH_SIZE: int = 1000
+    
+    # Bulk sharing: password x recipient pairs per request, rows per upsert
+    SHARE_BULK_MAX_PAIRS: int = 10000
+    SHARE_BULK_CHUNK_SIZE: int = 1000
+    # Users added to a group per request
+    GROUP_MEMBERS_MAX: int = 1000
+    
+    # Vault export / bulk import
+    EXPORT_CHUNK_SIZE: int = 500
+    IMPORT_CHUNK_SIZE: int = 500
+    # Longest import line or CSV record; longer ones are reported and skipped
+    IMPORT_MAX_RECORD_BYTES: int = 65536
+    
+    # Slow-query log (0 disables); plans are captured at most once per interval
+    SLOW_QUERY_THRESHOLD_MS: float = 500
+    SLOW_QUERY_BUFFER_SIZE: int = 100
+    SLOW_QUERY_EXPLAIN: bool = True
+    SLOW_QUERY_EXPLAIN_INTERVAL: float = 10  # seconds
     
     # Encryption
     ENCRYPTION_KEY: str
+    # Output of `python -m app.core.security`; skips PBKDF2 at worker start.
+    # Must be derived from ENCRYPTION_KEY, it takes precedence when set.
+    ENCRYPTION_KEY_DERIVED: Optional[str] = None
+    # Retired keys, comma separated and newest first, still accepted for
+    # decryption until app.tasks.key_rotation has re-encrypted the vault
+    ENCRYPTION_PREVIOUS_KEYS: str = ""
+    ENCRYPTION_PREVIOUS_KEYS_DERIVED: str = ""
+    KEY_ROTATION_BATCH_SIZE: int = 1000
+    KEY_ROTATION_PAUSE: float = 0.05  # seconds between batches
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""  # per-logger overrides, e.g. "app.api=DEBUG,sqlalchemy.engine=WARNING"
+    LOG_JSON: bool = True
+    LOG_SAMPLE_RATE: float = 1.0  # fraction of DEBUG/INFO records kept
+    LOG_QUEUE_SIZE: int = 10000
     
     # Email
     SMTP_TLS: bool = True
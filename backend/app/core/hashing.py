@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import HTTPException, status
+from app.core import metrics, security
+from app.core.config import settings
+
+
+def _timed(fn: Callable, *args) -> Tuple[Any, float, float]:
+    """Run fn in the worker and report when it started and how long it took."""
+    started = time.time()
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, started, time.perf_counter() - t0
+
+
+def _hash_worker(password: str) -> Tuple[str, float, float]:
+    return _timed(security.get_password_hash, password)
+
+
+def _verify_worker(plain_password: str, hashed_password: str) -> Tuple[bool, float, float]:
+    return _timed(security.verify_password, plain_password, hashed_password)
+
+
+class HashMetrics:
+    """Counters for queue wait and hash time, in seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.hash_time_total = 0.0
+        self.hash_time_max = 0.0
+
+    def observe(self, queue_wait: float, hash_time: float) -> None:
+        queue_wait = max(queue_wait, 0.0)
+        with self._lock:
+            self.completed += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+            self.hash_time_total += hash_time
+            self.hash_time_max = max(self.hash_time_max, hash_time)
+        metrics.PASSWORD_HASH_QUEUE_WAIT.observe(queue_wait)
+        metrics.PASSWORD_HASH_LATENCY.observe(hash_time)
+
+    def reject(self) -> None:
+        with self._lock:
+            self.rejected += 1
+        metrics.PASSWORD_HASH_REJECTED.inc()
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_wait_seconds_total": self.queue_wait_total,
+                "queue_wait_seconds_max": self.queue_wait_max,
+                "hash_seconds_total": self.hash_time_total,
+                "hash_seconds_max": self.hash_time_max,
+            }
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool so hashing never competes with
+    request handling for the GIL or the threadpool. At most
+    ``workers + queue_limit`` jobs are admitted; beyond that callers get a
+    503 with Retry-After instead of queueing indefinitely. ``workers=0``
+    falls back to the default threadpool.
+    """
+
+    def __init__(self, workers: int, queue_limit: int, retry_after: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.retry_after = retry_after
+        self.metrics = HashMetrics()
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_limit
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        self._reset_executor()
+
+    async def _submit(self, fn: Callable, *args) -> Any:
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.metrics.reject()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent authentication requests",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+            self._pending += 1
+        submitted = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, hash_time = await loop.run_in_executor(self._get_executor(), fn, *args)
+        except BrokenProcessPool:
+            self._reset_executor()
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+        self.metrics.observe(started - submitted, hash_time)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash_worker, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(_verify_worker, plain_password, hashed_password)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+)
+
+async def get_password_hash(password: str) -> str:
+    return await password_hasher.hash(password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
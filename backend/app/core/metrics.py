@@ -0,0 +1,210 @@
+"""
+Prometheus metrics for HTTP routes, the database and crypto.
+
+Under multi-worker uvicorn set PROMETHEUS_MULTIPROC_DIR to an empty,
+writable directory before the workers start: every worker then writes its
+samples there and /metrics aggregates all of them, whichever worker
+answers the scrape.
+"""
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client import REGISTRY
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status code", ["method", "route", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route"]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being served", ["method"], multiprocess_mode="livesum"
+)
+
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements executed")
+DB_STATEMENT_LATENCY = Histogram("db_statement_duration_seconds", "SQL statement execution time")
+DB_STATEMENTS_PER_REQUEST = Histogram(
+    "db_statements_per_request", "SQL statements issued per HTTP request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Time spent in SQL per HTTP request", ["route"]
+)
+
+# Connection pools, labelled by pool name; gauges sum over live workers
+DB_POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time to get a connection from the pool, waiting for a free slot and pre-ping included",
+    ["pool"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after the pool timeout", ["pool"]
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity", "Configured pool size plus max overflow", ["pool"], multiprocess_mode="livesum"
+)
+DB_POOL_CONNECTIONS = Counter(
+    "db_pool_connections_total", "Connection churn: opened, closed and invalidated connections",
+    ["pool", "event"],
+)
+DB_READ_ROUTES = Counter(
+    "db_read_routes_total", "Read-only requests by serving database (replica/primary) and reason",
+    ["target", "reason"],
+)
+DB_REPLICA_FAILURES = Counter(
+    "db_replica_failures_total", "Replica failures that took it out of rotation", ["replica"]
+)
+
+CRYPTO_LATENCY = Histogram(
+    "crypto_operation_duration_seconds", "Fernet encrypt/decrypt time", ["operation"],
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005, 0.01),
+)
+
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds", "Time hash jobs wait for a pool worker"
+)
+PASSWORD_HASH_LATENCY = Histogram("password_hash_duration_seconds", "bcrypt hash/verify time")
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Hash jobs rejected because the queue was full"
+)
+
+CACHE_REQUESTS = Counter("cache_requests_total", "In-process cache lookups", ["cache", "result"])
+
+
+class RequestDbStats:
+    """Mutable per-request accumulator; shared by reference with threadpool calls."""
+
+    __slots__ = ("request", "statements", "seconds")
+
+    def __init__(self, request=None):
+        self.request = request
+        self.statements = 0
+        self.seconds = 0.0
+
+
+request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_STATEMENTS.inc()
+    DB_STATEMENT_LATENCY.observe(elapsed)
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement on ``engine`` (pass ``async_engine.sync_engine`` for async)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class timed:
+    """Context manager observing elapsed time on a histogram (child)."""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+def render_metrics() -> Response:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the shared directory on shutdown."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def route_template(request) -> str:
+    """
+    Full path template of the matched route, e.g. ``/api/v1/passwords/{password_id}``.
+
+    Routes inside an included router may only know their router-relative
+    path, so the prefix is recovered from the concrete request path.
+    """
+    route = request.scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+    try:
+        rendered = template.format(**request.path_params)
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = request.url.path
+    if rendered != path and path.endswith(rendered):
+        return path[: len(path) - len(rendered)] + template
+    return template
+
+
+def setup_metrics(app):
+    @app.middleware("http")
+    async def metrics_middleware(request, call_next):
+        method = request.method
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        db_stats = RequestDbStats(request)
+        token = request_db_stats.set(db_stats)
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            request_db_stats.reset(token)
+            in_flight.dec()
+            route = route_template(request)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            DB_STATEMENTS_PER_REQUEST.labels(route).observe(db_stats.statements)
+            DB_TIME_PER_REQUEST.labels(route).observe(db_stats.seconds)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return render_metrics()
@@ -1,20 +1,23 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
+import hashlib
+from app.core import metrics
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
-def get_fernet_key(encryption_key: str) -> Fernet:
-    """Generate a valid Fernet key from the provided encryption key."""
+def derive_fernet_key(encryption_key: str) -> bytes:
+    """Derive the url-safe base64 Fernet key from the provided encryption key."""
     # Use PBKDF2 to derive a key
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
@@ -22,11 +25,45 @@ def get_fernet_key(encryption_key: str) -> Fernet:
         salt=b"pvc_salt",  # In production, use a secure random salt
         iterations=100000,
     )
-    key = base64.urlsafe_b64encode(kdf.derive(encryption_key.encode()))
-    return Fernet(key)
+    return base64.urlsafe_b64encode(kdf.derive(encryption_key.encode()))
+
+def get_fernet_key(encryption_key: str) -> Fernet:
+    """Generate a valid Fernet key from the provided encryption key."""
+    return Fernet(derive_fernet_key(encryption_key))
 
-# Initialize Fernet with the derived key
-fernet = get_fernet_key(settings.ENCRYPTION_KEY)
+def _split(keys: str) -> List[str]:
+    return [key.strip() for key in keys.split(",") if key.strip()]
+
+@lru_cache(maxsize=None)
+def get_primary_key() -> bytes:
+    """
+    The current Fernet key, derived on first use instead of at import. The
+    PBKDF2 derivation is skipped when ENCRYPTION_KEY_DERIVED is set; print
+    it with ``python -m app.core.security``.
+    """
+    if settings.ENCRYPTION_KEY_DERIVED:
+        return settings.ENCRYPTION_KEY_DERIVED.encode()
+    return derive_fernet_key(settings.ENCRYPTION_KEY)
+
+@lru_cache(maxsize=None)
+def get_fernet() -> MultiFernet:
+    """
+    The vault cipher: encrypts with the current key and decrypts with the
+    current or any previous key, newest first. After a rotation, keep the
+    old key in ENCRYPTION_PREVIOUS_KEYS (or its derived form in
+    ENCRYPTION_PREVIOUS_KEYS_DERIVED) until app.tasks.key_rotation has
+    re-encrypted every entry.
+    """
+    previous = [Fernet(key) for key in _split(settings.ENCRYPTION_PREVIOUS_KEYS_DERIVED)]
+    previous += [get_fernet_key(key) for key in _split(settings.ENCRYPTION_PREVIOUS_KEYS)]
+    return MultiFernet([Fernet(get_primary_key()), *previous])
+
+def key_id(key: bytes) -> str:
+    """Short, non-reversible identifier of a key, for checkpoints and logs."""
+    return hashlib.sha256(key).hexdigest()[:16]
+
+_ENCRYPT_LATENCY = metrics.CRYPTO_LATENCY.labels("encrypt")
+_DECRYPT_LATENCY = metrics.CRYPTO_LATENCY.labels("decrypt")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -45,10 +82,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 def encrypt_password(password: str) -> str:
-    return fernet.encrypt(password.encode()).decode()
+    with metrics.timed(_ENCRYPT_LATENCY):
+        return get_fernet().encrypt(password.encode()).decode()
 
 def decrypt_password(encrypted_password: str) -> str:
-    return fernet.decrypt(encrypted_password.encode()).decode()
+    with metrics.timed(_DECRYPT_LATENCY):
+        return get_fernet().decrypt(encrypted_password.encode()).decode()
 
 def setup_security(app):
     @app.middleware("http")
@@ -57,4 +96,8 @@ def setup_security(app):
         response.headers["X-Content-Type-Options"] = "nosniff"
         response.headers["X-Frame-Options"] = "DENY"
         response.headers["X-XSS-Protection"] = "1; mode=block"
-        return response 
\ No newline at end of file
+        return response
+
+if __name__ == "__main__":
+    # Pre-derive the Fernet key for ENCRYPTION_KEY_DERIVED
+    print(derive_fernet_key(settings.ENCRYPTION_KEY).decode())
@@ -0,0 +1,102 @@
+import hashlib
+import time
+from typing import Any, Dict, Optional
+from pydantic import ValidationError
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.auth import TokenPayload
+
+
+class TokenError(Exception):
+    """Raised by verifier backends when a token is invalid or expired."""
+
+
+class JoseVerifier:
+    """Default backend, python-jose."""
+
+    name = "jose"
+
+    def __init__(self, secret: str, algorithm: str):
+        from jose import jwt, JWTError
+
+        self._jwt = jwt
+        self._error = JWTError
+        self.secret = secret
+        self.algorithms = [algorithm]
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            return self._jwt.decode(token, self.secret, algorithms=self.algorithms)
+        except self._error as exc:
+            raise TokenError(str(exc)) from exc
+
+
+class PyJWTVerifier:
+    """PyJWT backend. Requires ``pip install pyjwt``."""
+
+    name = "pyjwt"
+
+    def __init__(self, secret: str, algorithm: str):
+        try:
+            import jwt
+        except ImportError as exc:
+            raise RuntimeError("JWT_BACKEND=pyjwt requires the PyJWT package") from exc
+
+        self._jwt = jwt
+        self.secret = secret
+        self.algorithms = [algorithm]
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            return self._jwt.decode(token, self.secret, algorithms=self.algorithms)
+        except self._jwt.PyJWTError as exc:
+            raise TokenError(str(exc)) from exc
+
+
+VERIFIER_BACKENDS = {
+    JoseVerifier.name: JoseVerifier,
+    PyJWTVerifier.name: PyJWTVerifier,
+}
+
+def get_verifier(backend: str, secret: str, algorithm: str):
+    try:
+        verifier_cls = VERIFIER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown JWT_BACKEND {backend!r}, expected one of {sorted(VERIFIER_BACKENDS)}")
+    return verifier_cls(secret, algorithm)
+
+
+class TokenVerifier:
+    """
+    Verifies access tokens through a pluggable backend and remembers the
+    verified claims by token digest until the token's own ``exp``, so a token
+    seen before skips signature verification and claim parsing.
+    """
+
+    def __init__(self, backend, cache: TTLCache):
+        self.backend = backend
+        self.cache = cache
+
+    def verify(self, token: str) -> TokenPayload:
+        key = hashlib.sha256(token.encode()).digest()
+        token_data = self.cache.get(key)
+        if token_data is not None:
+            return token_data
+        payload = self.backend.decode(token)
+        try:
+            token_data = TokenPayload(**payload)
+        except ValidationError as exc:
+            raise TokenError(str(exc)) from exc
+        exp: Optional[float] = payload.get("exp")
+        if exp is not None:
+            self.cache.set(key, token_data, ttl=float(exp) - time.time())
+        return token_data
+
+
+token_verifier = TokenVerifier(
+    get_verifier(settings.JWT_BACKEND, settings.JWT_SECRET, settings.JWT_ALGORITHM),
+    TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL, name="token"),
+)
+
+def verify_access_token(token: str) -> TokenPayload:
+    return token_verifier.verify(token)
@@ -0,0 +1,120 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, List, Tuple, Union
+
+EXPORT_FIELDS = ("title", "username", "password", "description")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def format_entries(entries: Iterable[Dict[str, Any]], fmt: str) -> str:
+    """Serialize a chunk of export entries as NDJSON lines or CSV rows."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+        writer.writerows(entries)
+        return buffer.getvalue()
+    return "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+
+
+def csv_header() -> str:
+    return ",".join(EXPORT_FIELDS) + "\n"
+
+
+def decode_line(line: bytes, max_bytes: int) -> Union[str, ValueError]:
+    if len(line) > max_bytes:
+        return ValueError(f"line longer than {max_bytes} bytes")
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError as exc:
+        return ValueError(f"invalid UTF-8: {exc.reason}")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[Union[str, ValueError]]:
+    """
+    Split a streamed UTF-8 body into lines without buffering the whole body.
+    Lines are split on the raw bytes (a newline byte never occurs inside a
+    multi-byte character). A line over ``max_bytes`` is discarded as it
+    streams in and yielded as a ValueError, as is one that is not UTF-8.
+    """
+    pending = b""
+    overlong = False
+    async for chunk in chunks:
+        *lines, rest = (pending + chunk).split(b"\n")
+        for line in lines:
+            if overlong:
+                overlong = False
+                yield ValueError(f"line longer than {max_bytes} bytes")
+            else:
+                yield decode_line(line, max_bytes)
+        if len(rest) > max_bytes:
+            overlong = True
+        pending = b"" if overlong else rest
+    if overlong:
+        yield ValueError(f"line longer than {max_bytes} bytes")
+    elif pending:
+        yield decode_line(pending, max_bytes)
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes], fmt: str, max_bytes: int
+) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], ValueError]]]:
+    """
+    Yield ``(line_number, record)`` for each entry of an NDJSON or CSV upload.
+    Unparseable entries are yielded as a ValueError so the caller can report
+    them and carry on. CSV needs a header row; quoted fields may span lines,
+    up to ``max_bytes`` per record, so a stray quote costs one error rather
+    than the rest of the upload.
+    """
+    header = None
+    record_lines: List[str] = []
+    record_bytes = 0
+    in_quotes = False
+    line_number = 0
+    async for line in iter_lines(chunks, max_bytes):
+        line_number += 1
+        if isinstance(line, ValueError):
+            # A CSV record cut by a bad line is dropped with it
+            record_lines, record_bytes, in_quotes = [], 0, False
+            yield line_number, line
+            continue
+        if fmt != "csv":
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as exc:
+                yield line_number, ValueError(str(exc))
+                continue
+            yield line_number, record
+            continue
+
+        record_lines.append(line)
+        record_bytes += len(line.encode()) + 1
+        if line.count('"') % 2:
+            in_quotes = not in_quotes
+        if in_quotes:
+            if record_bytes > max_bytes:
+                record_lines, record_bytes, in_quotes = [], 0, False
+                yield line_number, ValueError(f"record longer than {max_bytes} bytes (unterminated quoted field?)")
+            continue  # quoted field continues on the next line
+        text = "\n".join(record_lines)
+        record_lines, record_bytes = [], 0
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = values
+            continue
+        if len(values) != len(header):
+            yield line_number, ValueError(f"expected {len(header)} columns, got {len(values)}")
+            continue
+        yield line_number, dict(zip(header, values))
+    if record_lines:
+        yield line_number, ValueError("unterminated quoted field")
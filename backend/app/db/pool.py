@@ -0,0 +1,123 @@
+"""
+Connection pool configuration and instrumentation for the app's engines.
+
+Pool sizing, recycling, the pre-ping strategy and PgBouncer mode come from
+Settings (DB_POOL_*, DB_PGBOUNCER). Every engine built here publishes its
+checkout time, checked-out/overflow gauges and connection churn, labelled
+with the pool name.
+"""
+import logging
+import time
+from typing import Any, Callable, Dict
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import NullPool, QueuePool
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# connection_record.info key: when the connection went back to the pool
+_CHECKED_IN_AT = "pool_checked_in_at"
+
+
+class _TimedCheckout:
+    """Pool mixin timing ``connect()``; subclasses set ``metrics_name``."""
+
+    metrics_name = "default"
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            metrics.DB_POOL_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            metrics.DB_POOL_CHECKOUT.labels(self.metrics_name).observe(time.perf_counter() - started)
+
+
+def pool_options(url: str, name: str) -> Dict[str, Any]:
+    """
+    ``create_engine`` keyword arguments for ``url``. Sizing only applies to
+    queue pools; sqlite keeps its dialect's default pool.
+    """
+    parsed = make_url(url)
+    options: Dict[str, Any] = {}
+    if parsed.get_backend_name() == "sqlite":
+        # The threadpool adapter hops threads between calls, which sqlite refuses by default
+        options["connect_args"] = {"check_same_thread": False}
+    if settings.DB_PGBOUNCER and parsed.get_backend_name() == "postgresql":
+        base = NullPool
+        if parsed.get_driver_name() == "asyncpg":
+            # Cached prepared statements do not survive a server switch between transactions
+            options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    else:
+        base = parsed.get_dialect().get_pool_class(parsed)
+    if issubclass(base, QueuePool):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING == "always",
+        )
+    options["poolclass"] = type(f"Timed{base.__name__}", (_TimedCheckout, base), {"metrics_name": name})
+    return options
+
+
+def create_pooled_engine(factory: Callable[..., Any], url: str, name: str) -> Any:
+    """
+    Build an engine with ``factory`` (``create_engine`` or
+    ``create_async_engine``) and the configured pool, instrumented as ``name``.
+    """
+    engine = factory(url, **pool_options(url, name))
+    instrument_pool(getattr(engine, "sync_engine", engine), name)
+    return engine
+
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    """Pool metrics, plus the idle pre-ping when DB_POOL_PRE_PING is "idle"."""
+    idle_ping = settings.DB_POOL_PRE_PING == "idle" and not settings.DB_PGBOUNCER
+    idle_after = settings.DB_POOL_PRE_PING_IDLE
+    if isinstance(engine.pool, QueuePool):
+        metrics.DB_POOL_CAPACITY.labels(name).set(settings.DB_POOL_SIZE + max(settings.DB_MAX_OVERFLOW, 0))
+
+    def set_overflow() -> None:
+        current = engine.pool
+        if isinstance(current, QueuePool):
+            metrics.DB_POOL_OVERFLOW.labels(name).set(max(current.overflow(), 0))
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.DB_POOL_CONNECTIONS.labels(name, "opened").inc()
+
+    @event.listens_for(engine, "close")
+    def on_close(dbapi_connection, connection_record):
+        metrics.DB_POOL_CONNECTIONS.labels(name, "closed").inc()
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.DB_POOL_CONNECTIONS.labels(name, "invalidated").inc()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.pop(_CHECKED_IN_AT, None)
+        if idle_ping and checked_in_at is not None and time.monotonic() - checked_in_at > idle_after:
+            try:
+                alive = engine.dialect.do_ping(dbapi_connection)
+            except Exception:
+                alive = False
+            if not alive:
+                # The pool invalidates the connection and retries with a fresh one
+                logger.info("Discarding stale pooled connection", extra={"pool": name})
+                raise exc.DisconnectionError()
+        metrics.DB_POOL_CHECKED_OUT.labels(name).inc()
+        set_overflow()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        if connection_record is not None:
+            connection_record.info[_CHECKED_IN_AT] = time.monotonic()
+        metrics.DB_POOL_CHECKED_OUT.labels(name).dec()
+        set_overflow()
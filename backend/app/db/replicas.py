@@ -0,0 +1,122 @@
+"""
+Read replicas for the read-only endpoints (DB_REPLICA_URLS).
+
+``get_read_db`` in app.db.session serves each read from a healthy replica,
+round robin. A replica that cannot be reached is taken out of rotation for
+DB_REPLICA_RETRY_AFTER seconds and the request falls back to the primary.
+After a client commits, its reads stay on the primary for
+DB_REPLICA_STICKY_SECONDS so it sees its own writes: tracked per access
+token in this worker, and through a cookie so the other workers honour it.
+"""
+import logging
+import math
+import time
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import async_url, settings
+from app.db.pool import create_pooled_engine
+from app.db.slow_queries import slow_query_log
+
+logger = logging.getLogger(__name__)
+
+# Wall-clock time (seconds since the epoch) until which reads use the primary
+STICKY_COOKIE = "db_primary_until"
+
+
+class Replica:
+    """Engine and session factory of one replica, with its health state."""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.down_until = 0.0
+        self.engine: Engine = create_pooled_engine(create_engine, url, name)
+        self.session_factory = sessionmaker(
+            autocommit=False, autoflush=False, expire_on_commit=False, bind=self.engine
+        )
+        self.async_engine: Optional[AsyncEngine] = None
+        self.async_session_factory: Optional[sessionmaker] = None
+        engines = [self.engine]
+        if settings.DB_ASYNC:
+            self.async_engine = create_pooled_engine(create_async_engine, async_url(url), f"{name}_async")
+            self.async_session_factory = sessionmaker(
+                self.async_engine,
+                class_=AsyncSession,
+                autocommit=False,
+                autoflush=False,
+                expire_on_commit=False,
+            )
+            engines.append(self.async_engine.sync_engine)
+        for engine in engines:
+            metrics.instrument_engine(engine)
+            # Plans are captured on the primary, which has the same schema
+            slow_query_log.instrument(engine)
+            event.listen(engine, "handle_error", self._on_error)
+        logger.info("Replica engine %s created for %r", name, make_url(url))
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def mark_down(self) -> None:
+        self.down_until = time.monotonic() + settings.DB_REPLICA_RETRY_AFTER
+        metrics.DB_REPLICA_FAILURES.labels(self.name).inc()
+        logger.warning(
+            "Replica %s out of rotation for %ss", self.name, settings.DB_REPLICA_RETRY_AFTER,
+            extra={"replica": self.name},
+        )
+
+    def _on_error(self, context) -> None:
+        # Statement errors are the caller's; only a lost connection says the replica is unwell
+        if context.is_disconnect:
+            self.mark_down()
+
+    async def dispose(self) -> None:
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+        self.engine.dispose()
+
+
+class ReadYourWrites:
+    """
+    Clients that committed recently; their reads go to the primary. Only
+    this worker remembers the Authorization header. Other workers rely on
+    the client returning the ``db_primary_until`` cookie. Cross-origin
+    bearer-token clients do not send it, so for them the guarantee holds
+    only within the worker that took the write; elsewhere a read may still
+    hit a lagging replica.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        # Entry lifetimes come from DB_REPLICA_STICKY_SECONDS at mark time
+        self._recent = TTLCache(maxsize=maxsize, ttl=math.inf)
+
+    def mark(self, request: Request, response: Response) -> None:
+        seconds = settings.DB_REPLICA_STICKY_SECONDS
+        token = request.headers.get("authorization")
+        if token:
+            self._recent.set(token, True, ttl=seconds)
+        response.set_cookie(
+            STICKY_COOKIE,
+            f"{time.time() + seconds:.3f}",
+            max_age=math.ceil(seconds),
+            httponly=True,
+            samesite="lax",
+        )
+
+    def active(self, request: Request) -> bool:
+        token = request.headers.get("authorization")
+        if token and self._recent.get(token):
+            return True
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+
+read_your_writes = ReadYourWrites()
@@ -1,15 +1,260 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import itertools
+import logging
+import threading
+from typing import Any, AsyncGenerator, Callable, List, Optional, Union
+from fastapi import Depends, Request, Response
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from app.core import metrics
 from app.core.config import settings
+from app.db.pool import create_pooled_engine
+from app.db.replicas import Replica, read_your_writes
+from app.db.slow_queries import slow_query_log
 
-print(settings.DATABASE_URL)
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger(__name__)
 
-# Dependency
-def get_db():
-    db = SessionLocal()
+
+class Database:
+    """
+    Engines and session factories, created on first use instead of at import
+    so that importing the app (tests, tooling, reload) never touches the
+    database. The app lifespan creates them at startup and disposes them at
+    shutdown.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engine: Optional[Engine] = None
+        self._session_factory: Optional[sessionmaker] = None
+        self._async_engine: Optional[AsyncEngine] = None
+        self._async_session_factory: Optional[sessionmaker] = None
+        self._replicas: Optional[List[Replica]] = None
+        self._rotation = itertools.count()
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    engine = create_pooled_engine(create_engine, settings.DATABASE_URL, "primary")
+                    metrics.instrument_engine(engine)
+                    slow_query_log.instrument(engine)
+                    logger.info("Database engine created for %r", make_url(settings.DATABASE_URL))
+                    self._session_factory = sessionmaker(
+                        autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+                    )
+                    self._engine = engine
+        return self._engine
+
+    @property
+    def session_factory(self) -> sessionmaker:
+        engine = self.engine  # created together with its session factory
+        return self._session_factory
+
+    @property
+    def async_session_factory(self) -> Optional[sessionmaker]:
+        """AsyncSession factory over asyncpg/aiosqlite, or None unless DB_ASYNC=true."""
+        if not settings.DB_ASYNC:
+            return None
+        if self._async_engine is None:
+            with self._lock:
+                if self._async_engine is None:
+                    async_engine = create_pooled_engine(
+                        create_async_engine, settings.SQLALCHEMY_ASYNC_DATABASE_URL, "primary_async"
+                    )
+                    metrics.instrument_engine(async_engine.sync_engine)
+                    slow_query_log.instrument(async_engine.sync_engine)
+                    self._async_session_factory = sessionmaker(
+                        async_engine,
+                        class_=AsyncSession,
+                        autocommit=False,
+                        autoflush=False,
+                        expire_on_commit=False,
+                    )
+                    self._async_engine = async_engine
+        return self._async_session_factory
+
+    @property
+    def replicas(self) -> List[Replica]:
+        """Replicas from DB_REPLICA_URLS; empty when none are configured."""
+        if self._replicas is None:
+            self.engine  # created first: slow-query plans are captured on the primary
+            with self._lock:
+                if self._replicas is None:
+                    self._replicas = [
+                        Replica(f"replica{n}", url) for n, url in enumerate(settings.REPLICA_URLS)
+                    ]
+        return self._replicas
+
+    def healthy_replicas(self) -> List[Replica]:
+        """Replicas in rotation, starting from the next one in round-robin order."""
+        healthy = [replica for replica in self.replicas if replica.available]
+        if not healthy:
+            return healthy
+        start = next(self._rotation) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    async def dispose(self) -> None:
+        """Close pooled connections; engines are recreated on next use."""
+        with self._lock:
+            engine, async_engine, replicas = self._engine, self._async_engine, self._replicas
+            self._engine = self._session_factory = None
+            self._async_engine = self._async_session_factory = None
+            self._replicas = None
+        for replica in replicas or ():
+            await replica.dispose()
+        if async_engine is not None:
+            await async_engine.dispose()
+        if engine is not None:
+            engine.dispose()
+
+
+database = Database()
+
+
+class StreamedResultAdapter:
+    """Async iteration over a server-side cursor held by a sync Result."""
+
+    def __init__(self, result):
+        self.sync_result = result
+
+    async def partitions(self, size: int):
+        while True:
+            rows = await run_in_threadpool(self.sync_result.fetchmany, size)
+            if not rows:
+                break
+            yield rows
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_result.close)
+
+
+class AsyncSessionAdapter:
+    """
+    Expose a sync Session through the subset of the AsyncSession API used by
+    the endpoints. Every database call runs in the threadpool, so a request
+    only holds a worker thread for the duration of a single round trip.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def bind(self):
+        return self.sync_session.get_bind()
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    async def connection(self):
+        return await run_in_threadpool(self.sync_session.connection)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    async def stream(self, statement, params=None, **kwargs):
+        statement = statement.execution_options(stream_results=True)
+        result = await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+        return StreamedResultAdapter(result)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def refresh(self, instance: Any, attribute_names=None) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def delete(self, instance: Any) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self, objects=None) -> None:
+        await run_in_threadpool(self.sync_session.flush, objects)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn: Callable, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+DBSession = Union[AsyncSession, AsyncSessionAdapter]
+
+def track_writes(db: DBSession, request: Request, response: Response) -> None:
+    """With replicas configured, a commit keeps the client's next reads on the primary."""
+    if database.replicas:
+        event.listen(db.sync_session, "after_commit", lambda session: read_your_writes.mark(request, response))
+
+
+async def open_replica_session() -> Optional[DBSession]:
+    """
+    Session on the first healthy replica that hands out a connection. The
+    connection is checked out up front so that an unreachable replica is
+    skipped (and taken out of rotation) before the endpoint runs.
+    """
+    for replica in database.healthy_replicas():
+        if replica.async_session_factory is not None:
+            session = replica.async_session_factory()
+        else:
+            session = AsyncSessionAdapter(replica.session_factory())
+        try:
+            await session.connection()
+        except (exc.SQLAlchemyError, OSError):
+            replica.mark_down()
+            await session.close()
+            continue
+        return session
+    return None
+
+# Dependencies
+async def get_db(request: Request, response: Response) -> AsyncGenerator[DBSession, None]:
+    async_session_factory = database.async_session_factory
+    if async_session_factory is not None:
+        async with async_session_factory() as session:
+            track_writes(session, request, response)
+            yield session
+        return
+    db = AsyncSessionAdapter(database.session_factory())
+    track_writes(db, request, response)
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        await db.close()
+
+async def get_read_db(request: Request, db: DBSession = Depends(get_db)) -> AsyncGenerator[DBSession, None]:
+    """
+    Session for read-only endpoints: a healthy replica, or ``db`` (the
+    primary) when there is none, none is reachable, or the client committed
+    within DB_REPLICA_STICKY_SECONDS. ``db`` opens no connection unless used.
+    """
+    if not database.replicas:
+        yield db
+        return
+    replica_db = None
+    if read_your_writes.active(request):
+        reason = "sticky"
+    else:
+        replica_db = await open_replica_session()
+        reason = "healthy" if replica_db is not None else "unavailable"
+    if replica_db is None:
+        metrics.DB_READ_ROUTES.labels("primary", reason).inc()
+        yield db
+        return
+    metrics.DB_READ_ROUTES.labels("replica", reason).inc()
+    try:
+        yield replica_db
+    finally:
+        await replica_db.close()
@@ -0,0 +1,232 @@
+import logging
+import queue
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Dialect, Engine
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import request_id_var
+
+logger = logging.getLogger(__name__)
+
+# Execution option that keeps the EXPLAIN connection out of the slow-query log
+SKIP_OPTION = "slow_query_log_skip"
+
+# ANALYZE output echoes bound values back as string literals
+_PLAN_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+@dataclass
+class SlowQuery:
+    captured_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: Any
+    route: Optional[str]
+    request_id: Optional[str]
+    plan: Optional[List[str]] = None
+    plan_skipped: Optional[str] = None
+
+
+def redact(parameters: Any) -> Any:
+    """Replace bound values with their type names; vault data never reaches the log."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) if isinstance(value, (dict, list, tuple)) else type(value).__name__
+                for value in parameters]
+    return type(parameters).__name__
+
+
+def explain_prefix(dialect_name: str, statement: str) -> Optional[str]:
+    """
+    EXPLAIN flavour for a statement. ANALYZE runs the statement again, so it
+    is only used for plain SELECTs; writes get the estimated plan.
+    """
+    if dialect_name == "postgresql":
+        if statement.lstrip().upper().startswith("SELECT"):
+            return "EXPLAIN (ANALYZE, BUFFERS) "
+        return "EXPLAIN "
+    if dialect_name == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    return None
+
+
+class SlowQueryLog:
+    """
+    Records statements slower than ``threshold_ms`` into a bounded ring
+    buffer. The cursor hook only times the statement and enqueues it; a
+    background thread captures the plan on its own connection, at most once
+    per ``explain_interval`` seconds, then logs the entry. A threshold of 0
+    disables the log.
+    """
+
+    def __init__(self, threshold_ms: float, buffer_size: int, explain_interval: float, explain: bool = True):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.entries: deque = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.explain_engine: Optional[Engine] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max(buffer_size, 1))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last_explain = float("-inf")
+
+    def instrument(self, engine: Engine) -> None:
+        """
+        Hook ``engine`` (pass ``async_engine.sync_engine`` for async). Plans
+        are captured through the first sync engine hooked. Statements from an
+        async driver are recorded without a plan: their placeholders and
+        parameters cannot be replayed through a sync driver.
+        """
+        if self.explain_engine is None and not engine.dialect.is_async:
+            self.explain_engine = engine
+        if not event.contains(engine, "before_cursor_execute", self._before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def uninstrument(self, engine: Engine) -> None:
+        if event.contains(engine, "before_cursor_execute", self._before_cursor_execute):
+            event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        if self.explain_engine is engine:
+            self.explain_engine = None
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["slow_query_start"].pop()) * 1000
+        if self.threshold_ms <= 0 or elapsed_ms < self.threshold_ms:
+            return
+        if context is not None and context.execution_options.get(SKIP_OPTION):
+            return
+        stats = metrics.request_db_stats.get()
+        request = stats.request if stats is not None else None
+        entry = SlowQuery(
+            captured_at=datetime.now(timezone.utc),
+            duration_ms=round(elapsed_ms, 3),
+            statement=statement,
+            parameters=redact(parameters),
+            route=metrics.route_template(request) if request is not None else None,
+            request_id=request_id_var.get(),
+        )
+        # Raw parameters only travel to the EXPLAIN; they are never stored
+        explain_params = None if executemany else parameters
+        try:
+            self._queue.put_nowait((entry, conn.dialect, explain_params, executemany))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return
+        self._ensure_worker()
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="slow-query-log", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._process(*job)
+            except Exception:
+                logger.exception("Slow query capture failed")
+            finally:
+                self._queue.task_done()
+
+    def _process(self, entry: SlowQuery, dialect: Dialect, parameters: Any, executemany: bool) -> None:
+        prefix = explain_prefix(dialect.name, entry.statement)
+        if not self.explain:
+            entry.plan_skipped = "disabled"
+        elif dialect.is_async:
+            entry.plan_skipped = "async engine"
+        elif self.explain_engine is None:
+            entry.plan_skipped = "disabled"
+        elif executemany:
+            entry.plan_skipped = "executemany"
+        elif prefix is None:
+            entry.plan_skipped = "unsupported dialect"
+        elif time.monotonic() - self._last_explain < self.explain_interval:
+            entry.plan_skipped = "rate limited"
+        else:
+            self._last_explain = time.monotonic()
+            try:
+                entry.plan = self._explain(prefix + entry.statement, parameters)
+            except Exception as exc:
+                # The slow statement is still recorded, just without a plan
+                logger.debug("EXPLAIN failed", exc_info=True)
+                entry.plan_skipped = f"explain failed: {exc.__class__.__name__}"
+        with self._lock:
+            self.entries.append(entry)
+        # Attribute the record to the request that issued the statement
+        token = request_id_var.set(entry.request_id)
+        try:
+            logger.warning(
+                "Slow query",
+                extra={
+                    "duration_ms": entry.duration_ms,
+                    "statement": entry.statement,
+                    "parameters": entry.parameters,
+                    "route": entry.route,
+                    "plan": entry.plan,
+                },
+            )
+        finally:
+            request_id_var.reset(token)
+
+    def _explain(self, sql: str, parameters: Any) -> List[str]:
+        with self.explain_engine.connect() as conn:
+            conn = conn.execution_options(**{SKIP_OPTION: True})
+            transaction = conn.begin()
+            try:
+                rows = conn.exec_driver_sql(sql, parameters or ()).fetchall()
+            finally:
+                # ANALYZE executed the statement; leave nothing behind
+                transaction.rollback()
+        return [
+            _PLAN_LITERAL.sub("'?'", " | ".join(str(column) for column in row))
+            for row in rows
+        ]
+
+    def flush(self) -> None:
+        """Block until every queued statement has been processed."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stop(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = [asdict(entry) for entry in reversed(self.entries)]
+            dropped = self.dropped
+        return {
+            "threshold_ms": self.threshold_ms,
+            "explain_interval_seconds": self.explain_interval,
+            "dropped": dropped,
+            "queries": entries,
+        }
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    buffer_size=settings.SLOW_QUERY_BUFFER_SIZE,
+    explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+)
@@ -1,14 +1,12 @@
+from typing import Sequence
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.core.logging import setup_logging
+from app.core.metrics import setup_metrics
 from app.core.security import setup_security
-
-app = FastAPI(
-    title="PVC - Password Vault for Companies",
-    description="Secure password sharing platform for teams",
-    version="1.0.0",
-)
+from app.tasks.lifespan import lifespan
 
 # Set up CORS with specific origins
 origins = [
@@ -22,21 +20,45 @@ origins = [
     "*"                                  # Allow all origins for development
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    expose_headers=["*"],
-)
+def create_app(cors_origins: Sequence[str] = ("*",), cors_methods: Sequence[str] = ("*",)) -> FastAPI:
+    """
+    Build the application. Nothing here derives keys or opens connections;
+    those are created by the lifespan when a server starts the app. Run
+    with ``uvicorn --factory app.main:create_app``.
+    """
+    app = FastAPI(
+        title="PVC - Password Vault for Companies",
+        description="Secure password sharing platform for teams",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=cors_origins,
+        allow_credentials=True,
+        allow_methods=cors_methods,
+        allow_headers=["*"],
+        expose_headers=["*"],
+    )
+
+    # Include API router
+    app.include_router(api_router, prefix="/api/v1")
+
+    # Set up security middleware
+    setup_security(app)
+
+    # Structured logging and request ids
+    setup_logging(app)
+
+    # Prometheus metrics on /metrics
+    setup_metrics(app)
 
-# Include API router
-app.include_router(api_router, prefix="/api/v1")
+    @app.get("/")
+    async def root():
+        return {"message": "Welcome to PVC - Password Vault for Companies"}
 
-# Set up security middleware
-setup_security(app)
+    return app
 
-@app.get("/")
-async def root():
-    return {"message": "Welcome to PVC - Password Vault for Companies"} 
\ No newline at end of file
+# Module-level instance for `uvicorn app.main:app` and existing imports
+app = create_app()
@@ -2,6 +2,8 @@ from app.models.base import Base
 from app.models.user import User
 from app.models.password import Password
 from app.models.shared_password import SharedPassword
+from app.models.key_rotation import KeyRotation
+from app.models.group import Group, GroupMember, GroupShare
 
 # This ensures all models are registered with Base.metadata
-__all__ = ['Base', 'User', 'Password', 'SharedPassword']
\ No newline at end of file
+__all__ = ['Base', 'User', 'Password', 'SharedPassword', 'KeyRotation', 'Group', 'GroupMember', 'GroupShare']
\ No newline at end of file
@@ -0,0 +1,66 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Index, text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.models.base import Base
+from app.models.shared_password import ShareStatus
+
+class Group(Base):
+    __tablename__ = "groups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    owner = relationship("User")
+    members = relationship("GroupMember", back_populates="group", cascade="all, delete-orphan")
+    shares = relationship("GroupShare", back_populates="group", cascade="all, delete-orphan")
+
+class GroupMember(Base):
+    __tablename__ = "group_members"
+    __table_args__ = (
+        # Access resolution starts from the user: their groups
+        Index("ix_group_members_user_id_group_id", "user_id", "group_id"),
+    )
+
+    # The primary key (group_id, user_id) serves member lists and fan-out
+    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    group = relationship("Group", back_populates="members")
+    user = relationship("User")
+
+class GroupShare(Base):
+    """A password shared with every current member of a group."""
+
+    __tablename__ = "group_shares"
+    __table_args__ = (
+        # One share per password and group (upserted); also the decrypt access check
+        Index("uq_group_shares_password_id_group_id", "password_id", "group_id", unique=True),
+        # Group-received listing: live shares of the user's groups
+        Index("ix_group_shares_group_id_status_expires_at", "group_id", "status", "expires_at"),
+        # Expiry sweeper: live shares by expiry
+        Index(
+            "ix_group_shares_active_expires_at",
+            "expires_at",
+            postgresql_where=text("status = 'ACTIVE'"),
+            sqlite_where=text("status = 'ACTIVE'"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    password_id = Column(Integer, ForeignKey("passwords.id"), nullable=False)
+    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
+    status = Column(Enum(ShareStatus), default=ShareStatus.ACTIVE)
+    expires_at = Column(DateTime(timezone=True))
+    expires_in_hours = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    password = relationship("Password")
+    group = relationship("Group", back_populates="shares")
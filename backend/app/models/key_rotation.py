@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+class KeyRotation(Base):
+    """Progress of re-encrypting the vault under one encryption key."""
+    __tablename__ = "key_rotations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key_id = Column(String, unique=True, nullable=False)
+    last_password_id = Column(Integer, nullable=False, default=0)
+    rotated = Column(Integer, nullable=False, default=0)
+    already_current = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True))
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import DDL, Column, Integer, String, DateTime, ForeignKey, Boolean, Index, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
 
 class Password(Base):
     __tablename__ = "passwords"
+    __table_args__ = (
+        # Vault listing: owner_id filter, id order/cursor
+        Index("ix_passwords_owner_id_id", "owner_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -18,4 +22,47 @@ class Password(Base):
     
     # Relationships
     owner = relationship("User", back_populates="passwords")
-    shared_with = relationship("SharedPassword", back_populates="password") 
\ No newline at end of file
+    shared_with = relationship("SharedPassword", back_populates="password")
+
+# Vault search (GET /passwords/?q=). These indexes live outside the ORM
+# metadata because each dialect needs its own kind; the migration creates
+# the same objects.
+
+# sqlite: trigram FTS5 shadow table over the searchable columns, kept in
+# sync by triggers (re-encryption does not touch it)
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE passwords_fts USING fts5("
+    "title, username, description, content='passwords', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER passwords_fts_ai AFTER INSERT ON passwords BEGIN "
+    "INSERT INTO passwords_fts(rowid, title, username, description) "
+    "VALUES (new.id, new.title, new.username, new.description); END",
+    "CREATE TRIGGER passwords_fts_ad AFTER DELETE ON passwords BEGIN "
+    "INSERT INTO passwords_fts(passwords_fts, rowid, title, username, description) "
+    "VALUES ('delete', old.id, old.title, old.username, old.description); END",
+    "CREATE TRIGGER passwords_fts_au AFTER UPDATE OF title, username, description ON passwords BEGIN "
+    "INSERT INTO passwords_fts(passwords_fts, rowid, title, username, description) "
+    "VALUES ('delete', old.id, old.title, old.username, old.description); "
+    "INSERT INTO passwords_fts(rowid, title, username, description) "
+    "VALUES (new.id, new.title, new.username, new.description); END",
+]
+
+# Postgres: one trigram GIN index answering ILIKE '%q%' on any of the columns
+POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_passwords_search_trgm ON passwords USING gin "
+    "(title gin_trgm_ops, username gin_trgm_ops, description gin_trgm_ops)",
+]
+
+def _pg_trgm_available(ddl, target, bind, **kw) -> bool:
+    # Search still works without the index, only slower
+    return bind.dialect.name == "postgresql" and bind.execute(
+        text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).first() is not None
+
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Password.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Password.__table__, "after_create", DDL(statement).execute_if(callable_=_pg_trgm_available))
+event.listen(
+    Password.__table__, "before_drop", DDL("DROP TABLE IF EXISTS passwords_fts").execute_if(dialect="sqlite")
+)
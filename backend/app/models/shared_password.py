@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Enum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.models.base import Base
@@ -11,6 +11,27 @@ class ShareStatus(str, enum.Enum):
 
 class SharedPassword(Base):
     __tablename__ = "shared_passwords"
+    __table_args__ = (
+        # One share per password and recipient; re-sharing upserts. Also serves
+        # the decrypt access check and the shares-by-owner join
+        Index("uq_shared_passwords_password_id_shared_with_id", "password_id", "shared_with_id", unique=True),
+        # Received shares and count, filtered by recipient, status and expiry
+        Index("ix_shared_passwords_shared_with_id_status_expires_at", "shared_with_id", "status", "expires_at"),
+        # Live shares only (partial in Postgres)
+        Index(
+            "ix_shared_passwords_active_shared_with_id_expires_at",
+            "shared_with_id",
+            "expires_at",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
+        # Expiry sweeper: live shares by expiry
+        Index(
+            "ix_shared_passwords_active_expires_at",
+            "expires_at",
+            postgresql_where=text("status = 'ACTIVE'"),
+            sqlite_where=text("status = 'ACTIVE'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     password_id = Column(Integer, ForeignKey("passwords.id"), nullable=False)
@@ -20,6 +20,8 @@ class User(Base):
     is_superuser = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped whenever the user's vault, received shares or profile change (ETags)
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     passwords = relationship("Password", back_populates="owner")
@@ -0,0 +1,36 @@
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field
+from app.schemas.password import PasswordResponse
+
+class GroupCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+
+class GroupResponse(BaseModel):
+    id: int
+    name: str
+    owner_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class GroupMembersAdd(BaseModel):
+    user_ids: List[int] = []
+    emails: List[EmailStr] = []
+
+class GroupShareCreate(BaseModel):
+    password_ids: List[int] = Field(..., min_length=1)
+    expires_in_hours: int
+
+class GroupShareResult(BaseModel):
+    shared: int
+    password_ids: List[int]
+    expires_at: datetime
+
+class GroupSharedPasswordResponse(BaseModel):
+    """A password reachable through one or more of the user's groups."""
+    password_id: int
+    expires_at: datetime  # the latest expiry among those groups' shares
+    password: PasswordResponse
@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from app.schemas.user import UserResponse
 
 class PasswordBase(BaseModel):
@@ -27,4 +27,30 @@ class Password(PasswordInDBBase):
     pass
 
 class PasswordResponse(PasswordInDBBase):
-    owner: UserResponse 
\ No newline at end of file
+    owner: UserResponse 
+
+class PasswordDecryptBatch(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=500)
+
+class DecryptedPassword(BaseModel):
+    id: int
+    password: str
+
+class PasswordDecryptBatchResponse(BaseModel):
+    passwords: List[DecryptedPassword]
+    denied: List[int]
+
+class ImportChunk(BaseModel):
+    chunk: int
+    imported: int
+    total: int
+
+class ImportLineError(BaseModel):
+    line: int
+    detail: str
+
+class PasswordImportResult(BaseModel):
+    imported: int
+    failed: int
+    chunks: List[ImportChunk]
+    errors: List[ImportLineError]
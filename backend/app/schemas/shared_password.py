@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, EmailStr, Field
 from app.models.shared_password import ShareStatus
 from app.schemas.password import PasswordResponse
 from app.schemas.user import UserResponse
@@ -13,6 +13,18 @@ class SharedPasswordBase(BaseModel):
 class SharedPasswordCreate(SharedPasswordBase):
     pass
 
+class SharedPasswordBulkCreate(BaseModel):
+    password_ids: List[int] = Field(..., min_length=1)
+    shared_with_ids: List[int] = []
+    shared_with_emails: List[EmailStr] = []
+    expires_in_hours: int
+
+class SharedPasswordBulkResult(BaseModel):
+    shared: int
+    password_ids: List[int]
+    shared_with_ids: List[int]
+    expires_at: datetime
+
 class SharedPasswordInDBBase(SharedPasswordBase):
     id: int
     status: ShareStatus
@@ -0,0 +1,163 @@
+"""
+Re-encrypt the vault under the current encryption key after a rotation.
+
+1. Put the new secret in ENCRYPTION_KEY (or ENCRYPTION_KEY_DERIVED) and
+   the old one first in ENCRYPTION_PREVIOUS_KEYS, then roll the workers;
+   they now encrypt with the new key and still decrypt the old entries.
+2. Run ``python -m app.tasks.key_rotation`` once, next to the API.
+3. When it reports completion, drop the old key from the settings.
+
+The job walks ``passwords`` in id order in batches, each its own short
+transaction holding only that batch's row locks, and records the last id in
+``key_rotations`` in the same transaction. Interrupting and re-running it
+resumes from the checkpoint.
+"""
+import argparse
+import logging
+import time
+from typing import Any, Dict, Optional
+from cryptography.fernet import Fernet, InvalidToken
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import func
+from app.core import security
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.db.session import database
+from app.models.key_rotation import KeyRotation
+from app.models.password import Password
+
+logger = logging.getLogger(__name__)
+
+passwords = Password.__table__
+rotations = KeyRotation.__table__
+
+# Keep Password.updated_at: re-encryption is not a user-visible change
+_reencrypt = (
+    update(passwords)
+    .where(passwords.c.id == bindparam("b_id"), passwords.c.encrypted_password == bindparam("b_old"))
+    .values(encrypted_password=bindparam("b_new"), updated_at=passwords.c.updated_at)
+)
+
+
+class KeyRotationJob:
+    """
+    Rotates every ciphertext to the current key. Entries that already use it
+    are left untouched, and an UPDATE only applies if the ciphertext is still
+    the one that was read, so concurrent edits from the API always win.
+    """
+
+    def __init__(self, engine: Engine, batch_size: int, pause: float = 0.0):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.pause = pause
+        self.primary = Fernet(security.get_primary_key())
+        self.cipher = security.get_fernet()
+        self.key_id = security.key_id(security.get_primary_key())
+
+    def _ensure_checkpoint(self) -> None:
+        try:
+            with self.engine.begin() as conn:
+                if conn.execute(select(rotations.c.id).where(rotations.c.key_id == self.key_id)).first() is None:
+                    conn.execute(insert(rotations).values(
+                        key_id=self.key_id, last_password_id=0, rotated=0, already_current=0, failed=0
+                    ))
+        except IntegrityError:
+            pass  # another runner created it first
+
+    def rotate_batch(self) -> int:
+        """Process the next batch; returns the number of entries read, 0 when done."""
+        with self.engine.begin() as conn:
+            # Locking the checkpoint serializes concurrent runners
+            checkpoint = conn.execute(
+                select(rotations).where(rotations.c.key_id == self.key_id).with_for_update()
+            ).one()
+            rows = conn.execute(
+                select(passwords.c.id, passwords.c.encrypted_password)
+                .where(passwords.c.id > checkpoint.last_password_id)
+                .order_by(passwords.c.id)
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                if checkpoint.completed_at is None:
+                    conn.execute(
+                        update(rotations).where(rotations.c.id == checkpoint.id).values(completed_at=func.now())
+                    )
+                return 0
+
+            changes = []
+            current = failed = 0
+            for row in rows:
+                token = row.encrypted_password.encode()
+                try:
+                    self.primary.decrypt(token)
+                    current += 1
+                    continue
+                except InvalidToken:
+                    pass
+                try:
+                    changes.append({
+                        "b_id": row.id,
+                        "b_old": row.encrypted_password,
+                        "b_new": self.cipher.rotate(token).decode(),
+                    })
+                except InvalidToken:
+                    failed += 1
+                    logger.warning("Entry not decryptable with any configured key", extra={"password_id": row.id})
+            if changes:
+                conn.execute(_reencrypt, changes)
+            conn.execute(
+                update(rotations)
+                .where(rotations.c.id == checkpoint.id)
+                .values(
+                    last_password_id=rows[-1].id,
+                    rotated=rotations.c.rotated + len(changes),
+                    already_current=rotations.c.already_current + current,
+                    failed=rotations.c.failed + failed,
+                )
+            )
+        return len(rows)
+
+    def run(self, max_batches: Optional[int] = None) -> Dict[str, Any]:
+        """Rotate until done (or for ``max_batches``), pausing between batches."""
+        self._ensure_checkpoint()
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            if not self.rotate_batch():
+                break
+            batches += 1
+            if batches % 100 == 0:
+                logger.info("Key rotation progress", extra=self.progress())
+            if self.pause:
+                time.sleep(self.pause)
+        return self.progress()
+
+    def progress(self) -> Dict[str, Any]:
+        with self.engine.connect() as conn:
+            checkpoint = conn.execute(select(rotations).where(rotations.c.key_id == self.key_id)).one()
+        return {
+            "key_id": checkpoint.key_id,
+            "last_password_id": checkpoint.last_password_id,
+            "rotated": checkpoint.rotated,
+            "already_current": checkpoint.already_current,
+            "failed": checkpoint.failed,
+            "completed": checkpoint.completed_at is not None,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.KEY_ROTATION_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.KEY_ROTATION_PAUSE, help="seconds between batches")
+    args = parser.parse_args()
+
+    configure_logging()
+    job = KeyRotationJob(database.engine, batch_size=args.batch_size, pause=args.pause)
+    progress = job.run()
+    logger.info("Key rotation finished", extra=progress)
+    print(progress)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+from app.core import hashing, metrics, security
+from app.core.config import settings
+from app.db.session import database
+from app.db.slow_queries import slow_query_log
+from app.tasks.share_expiry import ShareExpirySweeper
+
+@asynccontextmanager
+async def lifespan(app):
+    # Pay for key derivation and engine setup before the first request, off the event loop
+    await run_in_threadpool(security.get_fernet)
+    engine = await run_in_threadpool(lambda: database.engine)
+    sweeper = app.state.share_expiry_sweeper = ShareExpirySweeper(
+        engine,
+        batch_size=settings.SHARE_SWEEP_BATCH_SIZE,
+        interval=settings.SHARE_SWEEP_INTERVAL,
+    )
+    if settings.SHARE_SWEEP_ENABLED:
+        sweeper.start()
+    try:
+        yield
+    finally:
+        await sweeper.stop()
+        hashing.password_hasher.shutdown()
+        slow_query_log.stop()
+        await database.dispose()
+        metrics.mark_process_dead()
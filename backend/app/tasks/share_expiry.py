@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import Table, func, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from starlette.concurrency import run_in_threadpool
+from app.models.group import GroupShare
+from app.models.shared_password import SharedPassword, ShareStatus
+
+logger = logging.getLogger(__name__)
+
+# pg advisory lock key shared by every worker; only the holder sweeps
+SWEEP_LOCK_KEY = 7320001
+
+# Direct and group shares expire alike
+SHARE_TABLES = (SharedPassword.__table__, GroupShare.__table__)
+
+
+@dataclass
+class SweepStats:
+    runs: int = 0
+    skipped_locked: int = 0
+    total_expired: int = 0
+    last_started_at: Optional[datetime] = None
+    last_duration_seconds: Optional[float] = None
+    last_expired: Optional[int] = None
+    last_batches: Optional[int] = None
+    last_error: Optional[str] = None
+
+
+class ShareExpirySweeper:
+    """
+    Moves ACTIVE shares, direct and group, past ``expires_at`` to EXPIRED in
+    bounded batches, each its own short UPDATE transaction, so live-share
+    queries and the partial indexes only carry live rows. On Postgres the sweep runs under a
+    session advisory lock so only one uvicorn worker sweeps at a time; other
+    dialects are assumed to be single-process.
+    """
+
+    def __init__(self, engine: Engine, batch_size: int, interval: float):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.interval = interval
+        self.stats = SweepStats()
+        self._task: Optional[asyncio.Task] = None
+
+    def _try_lock(self, conn: Connection) -> bool:
+        if conn.dialect.name != "postgresql":
+            return True
+        with conn.begin():
+            return conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": SWEEP_LOCK_KEY}).scalar()
+
+    def _unlock(self, conn: Connection) -> None:
+        if conn.dialect.name == "postgresql":
+            with conn.begin():
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SWEEP_LOCK_KEY})
+
+    def expire_batch(self, conn: Connection, now: datetime, shares: Table = SharedPassword.__table__) -> int:
+        due = (
+            select(shares.c.id)
+            .where(shares.c.status == ShareStatus.ACTIVE, shares.c.expires_at <= now)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        with conn.begin():
+            result = conn.execute(
+                update(shares)
+                .where(shares.c.id.in_(due))
+                .values(status=ShareStatus.EXPIRED, updated_at=func.now())
+            )
+        return result.rowcount
+
+    def sweep_once(self) -> Optional[int]:
+        """Expire everything due; returns the row count, or None if another worker holds the lock."""
+        started = time.monotonic()
+        now = datetime.now().astimezone()
+        with self.engine.connect() as conn:
+            if not self._try_lock(conn):
+                self.stats.skipped_locked += 1
+                return None
+            try:
+                expired = batches = 0
+                for shares in SHARE_TABLES:
+                    while True:
+                        count = self.expire_batch(conn, now, shares)
+                        batches += 1
+                        expired += count
+                        if count < self.batch_size:
+                            break
+            finally:
+                self._unlock(conn)
+        self.stats.runs += 1
+        self.stats.total_expired += expired
+        self.stats.last_started_at = now
+        self.stats.last_duration_seconds = time.monotonic() - started
+        self.stats.last_expired = expired
+        self.stats.last_batches = batches
+        self.stats.last_error = None
+        if expired:
+            logger.info("Expired shares", extra={"expired": expired, "batches": batches})
+        return expired
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await run_in_threadpool(self.sweep_once)
+            except Exception as exc:
+                self.stats.last_error = repr(exc)
+                logger.exception("Share expiry sweep failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "batch_size": self.batch_size,
+            "interval_seconds": self.interval,
+            **asdict(self.stats),
+        }
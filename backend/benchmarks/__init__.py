@@ -0,0 +1 @@
+# Benchmarks, run as modules from the backend directory: python -m benchmarks.<name>
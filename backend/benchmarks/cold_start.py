@@ -0,0 +1,69 @@
+"""
+Cold-start cost of a worker: import time of the app module, time to build
+the app with create_app(), and time until the first request is answered
+(lifespan startup included). Every sample is a fresh interpreter:
+
+    python -m benchmarks.cold_start [--runs 10]
+
+Set ENCRYPTION_KEY_DERIVED (see ``python -m app.core.security``) to compare
+against runtime PBKDF2 key derivation.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks import env  # noqa: F401  (settings defaults)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import asyncio, json, time
+import httpx  # the client is not part of the app's cost
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+application = app.main.create_app()
+created = time.perf_counter()
+
+async def first_request():
+    transport = httpx.ASGITransport(app=application)
+    async with application.router.lifespan_context(application):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/")
+            response.raise_for_status()
+
+asyncio.run(first_request())
+answered = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (answered - created) * 1000,
+    "total_ms": (answered - started) * 1000,
+}))
+"""
+
+
+def sample() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    samples = [sample() for _ in range(args.runs)]
+    print(f"{'phase':<16} {'median ms':>10} {'min ms':>10}")
+    for phase in samples[0]:
+        values = [s[phase] for s in samples]
+        print(f"{phase:<16} {statistics.median(values):>10.1f} {min(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
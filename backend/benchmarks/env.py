@@ -0,0 +1,11 @@
+"""Settings defaults so benchmarks run without a .env; real env vars win."""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("DB_USER", "bench")
+os.environ.setdefault("DB_PASSWORD", "bench")
+os.environ.setdefault("DB_NAME", "bench")
+os.environ.setdefault("JWT_SECRET", "bench-jwt-secret-of-at-least-32-bytes")
+os.environ.setdefault("ENCRYPTION_KEY", "bench-encryption-key")
+os.environ.setdefault("SHARE_SWEEP_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
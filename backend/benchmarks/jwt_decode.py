@@ -0,0 +1,42 @@
+"""
+Micro-benchmark for access-token verification.
+
+Compares the per-request cost of decoding a token with each verifier backend,
+with and without the verified-token cache:
+
+    python -m benchmarks.jwt_decode [--iterations 20000]
+"""
+import argparse
+import timeit
+from datetime import timedelta
+
+from benchmarks import env  # noqa: F401  (settings defaults)
+from app.core import security, tokens
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = security.create_access_token(
+        {"sub": "42"}, expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    print(f"{'backend':<8} {'cache':<6} {'us/decode':>10}")
+    for name in tokens.VERIFIER_BACKENDS:
+        try:
+            backend = tokens.get_verifier(name, settings.JWT_SECRET, settings.JWT_ALGORITHM)
+        except RuntimeError as exc:
+            print(f"{name:<8} skipped: {exc}")
+            continue
+        for cached in (False, True):
+            verifier = tokens.TokenVerifier(backend, TTLCache(maxsize=1024 if cached else 0, ttl=300))
+            verifier.verify(token)
+            seconds = timeit.timeit(lambda: verifier.verify(token), number=args.iterations)
+            print(f"{name:<8} {'yes' if cached else 'no':<6} {seconds / args.iterations * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Load scenarios against the API, either in-process (ASGI, no network) or
+against a running uvicorn. Seed the database first with benchmarks.seed:
+
+    python -m benchmarks.seed --reset
+    python -m benchmarks.load --output before.json
+    python -m benchmarks.load --url http://localhost:8000 --output after.json --baseline before.json
+
+Scenarios (``--scenarios``, comma separated, default all):
+
+  login_storm        POST /auth/login, cycling through the seeded users
+  list_10/1k/50k     GET /passwords/ (one page) for vaults of that size
+  decrypt_burst      GET /passwords/{id}/decrypt over one vault page
+  share_fanout       POST /shared-passwords/ of one entry to many users
+  received_polling   GET /shared-passwords/received by --pollers users
+
+Each scenario reports p50/p95/p99/mean/max latency in ms, requests per
+second and error count. Results are written as JSON together with the git
+commit, so runs from two commits can be compared with ``--baseline``.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from benchmarks import env  # noqa: F401  (settings defaults)
+import httpx
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+from benchmarks.seed import BENCH_PASSWORD, SHARER_EMAIL, VAULT_SIZES, user_email, vault_email
+
+API = settings.API_V1_STR
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int
+    errors: int
+    concurrency: int
+    duration_seconds: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    max_ms: float
+
+
+def summarize(name: str, latencies: List[float], errors: int, concurrency: int, duration: float) -> ScenarioResult:
+    ms = sorted(latency * 1000 for latency in latencies) or [0.0]
+    cuts = statistics.quantiles(ms, n=100, method="inclusive") if len(ms) > 1 else ms * 99
+    return ScenarioResult(
+        name=name,
+        requests=len(latencies),
+        errors=errors,
+        concurrency=concurrency,
+        duration_seconds=round(duration, 3),
+        rps=round(len(latencies) / duration, 1) if duration else 0.0,
+        p50_ms=round(cuts[49], 2),
+        p95_ms=round(cuts[94], 2),
+        p99_ms=round(cuts[98], 2),
+        mean_ms=round(statistics.fmean(ms), 2),
+        max_ms=round(ms[-1], 2),
+    )
+
+
+async def drive(
+    send: Callable[[int], Awaitable[httpx.Response]], count: int, concurrency: int
+) -> tuple:
+    """Issue ``count`` requests from ``concurrency`` workers; returns (latencies, errors, seconds)."""
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < count:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await send(index)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+class Bench:
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.tokens: Dict[str, str] = {}
+
+    async def login(self, email: str) -> httpx.Response:
+        return await self.client.post(
+            f"{API}/auth/login", data={"username": email, "password": BENCH_PASSWORD}
+        )
+
+    async def headers(self, email: str) -> Dict[str, str]:
+        if email not in self.tokens:
+            response = await self.login(email)
+            response.raise_for_status()
+            self.tokens[email] = response.json()["access_token"]
+        return {"Authorization": f"Bearer {self.tokens[email]}"}
+
+    async def run(self, name: str, send: Callable[[int], Awaitable[httpx.Response]]) -> ScenarioResult:
+        if self.args.warmup:
+            await drive(send, self.args.warmup, self.args.concurrency)
+        latencies, errors, duration = await drive(send, self.args.requests, self.args.concurrency)
+        return summarize(name, latencies, errors, self.args.concurrency, duration)
+
+    async def login_storm(self) -> ScenarioResult:
+        users = self.args.users
+        return await self.run("login_storm", lambda i: self.login(user_email(i % users)))
+
+    async def listing(self, size: int, name: str) -> ScenarioResult:
+        headers = await self.headers(vault_email(size))
+        params = {"limit": self.args.page_size}
+        return await self.run(
+            name, lambda i: self.client.get(f"{API}/passwords/", headers=headers, params=params)
+        )
+
+    async def decrypt_burst(self) -> ScenarioResult:
+        headers = await self.headers(vault_email(1000))
+        response = await self.client.get(
+            f"{API}/passwords/", headers=headers, params={"limit": self.args.page_size}
+        )
+        ids = [entry["id"] for entry in response.json()]
+        return await self.run(
+            "decrypt_burst",
+            lambda i: self.client.get(f"{API}/passwords/{ids[i % len(ids)]}/decrypt", headers=headers),
+        )
+
+    async def share_fanout(self) -> ScenarioResult:
+        headers = await self.headers(SHARER_EMAIL)
+        response = await self.client.get(f"{API}/passwords/", headers=headers, params={"limit": 1})
+        password_id = response.json()[0]["id"]
+        recipients = min(self.args.users, self.args.requests)
+        lookups = await asyncio.gather(*(
+            self.client.get(f"{API}/users/by-email/{user_email(i)}", headers=headers)
+            for i in range(recipients)
+        ))
+        recipient_ids = [lookup.json()["id"] for lookup in lookups]
+        return await self.run(
+            "share_fanout",
+            lambda i: self.client.post(
+                f"{API}/shared-passwords/",
+                headers=headers,
+                json={
+                    "password_id": password_id,
+                    "shared_with_id": recipient_ids[i % len(recipient_ids)],
+                    "expires_in_hours": 1,
+                },
+            ),
+        )
+
+    async def received_polling(self) -> ScenarioResult:
+        pollers = min(self.args.pollers, self.args.users)
+        headers = await asyncio.gather(*(self.headers(user_email(i)) for i in range(pollers)))
+        return await self.run(
+            "received_polling",
+            lambda i: self.client.get(f"{API}/shared-passwords/received", headers=headers[i % pollers]),
+        )
+
+
+def listing_scenario(size: int):
+    name = f"list_{size // 1000}k" if size >= 1000 and size % 1000 == 0 else f"list_{size}"
+    return name, lambda bench: bench.listing(size, name)
+
+
+SCENARIOS: Dict[str, Callable[[Bench], Awaitable[ScenarioResult]]] = {
+    "login_storm": Bench.login_storm,
+    **dict(listing_scenario(size) for size in VAULT_SIZES),
+    "decrypt_burst": Bench.decrypt_burst,
+    "share_fanout": Bench.share_fanout,
+    "received_polling": Bench.received_polling,
+}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_all(args: argparse.Namespace) -> List[ScenarioResult]:
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=timeout)
+        results = await _run_with(client, args, names)
+    else:
+        from app.main import app
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout)
+        async with app.router.lifespan_context(app):
+            results = await _run_with(client, args, names)
+    return results
+
+
+async def _run_with(client: httpx.AsyncClient, args: argparse.Namespace, names: List[str]) -> List[ScenarioResult]:
+    results = []
+    async with client:
+        bench = Bench(client, args)
+        for name in names:
+            result = await SCENARIOS[name](bench)
+            print_result(result)
+            results.append(result)
+    return results
+
+
+def print_result(result: ScenarioResult, baseline: Optional[Dict] = None) -> None:
+    line = (
+        f"{result.name:<18} {result.rps:>9.1f} {result.p50_ms:>9.2f} {result.p95_ms:>9.2f} "
+        f"{result.p99_ms:>9.2f} {result.errors:>7}"
+    )
+    if baseline:
+        def change(new, old):
+            return f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+        line += f"   rps {change(result.rps, baseline['rps']):>6}  p95 {change(result.p95_ms, baseline['p95_ms']):>6}"
+    print(line, flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server; default runs the app in-process")
+    parser.add_argument("--scenarios", help="comma separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--users", type=int, default=1000, help="must match benchmarks.seed --users")
+    parser.add_argument("--pollers", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<18} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    results = asyncio.run(run_all(args))
+
+    if args.baseline:
+        previous = json.loads(args.baseline.read_text())
+        print(f"\ncompared with {previous.get('commit')} ({args.baseline})")
+        by_name = {entry["name"]: entry for entry in previous["results"]}
+        for result in results:
+            print_result(result, by_name.get(result.name))
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "target": args.url or "in-process",
+            "database": make_url(settings.DATABASE_URL).get_backend_name(),
+            "python": platform.python_version(),
+            "settings": {
+                key: getattr(args, key)
+                for key in ("requests", "concurrency", "warmup", "users", "pollers", "page_size")
+            },
+            "results": [asdict(result) for result in results],
+        }
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
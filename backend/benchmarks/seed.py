@@ -0,0 +1,170 @@
+"""
+Seed a database for the load benchmarks.
+
+Creates deterministic accounts that benchmarks.load relies on, all with the
+password ``benchpassword``:
+
+* ``vault-<n>@bench.example.com``  owners of vaults with 10, 1k and 50k entries
+* ``user-<i>@bench.example.com``   login-storm and polling users; each receives
+                                   ``--received`` live shares from vault-1000
+* ``sharer@bench.example.com``     owner of the entry used for share fan-out
+
+``--filler`` adds that many extra entries spread over the users, so tables
+and indexes have production-like sizes (millions of rows is fine; rows are
+inserted in ``--chunk-size`` batches, each its own transaction)::
+
+    python -m benchmarks.seed --users 2000 --filler 2000000 --reset
+
+The target is DATABASE_URL, the same database the app uses.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List
+
+from benchmarks import env  # noqa: F401  (settings defaults)
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Engine
+from app.core import security
+from app.db.session import database
+from app.models import Base, Password, SharedPassword, User
+from app.models.shared_password import ShareStatus
+
+BENCH_PASSWORD = "benchpassword"
+VAULT_SIZES = (10, 1000, 50000)
+SHARE_SOURCE_VAULT = 1000
+
+
+DOMAIN = "@bench.example.com"
+SHARER_EMAIL = "sharer" + DOMAIN
+
+
+def vault_email(size: int) -> str:
+    return f"vault-{size}{DOMAIN}"
+
+
+def user_email(index: int) -> str:
+    return f"user-{index}{DOMAIN}"
+
+
+def chunked(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def insert_rows(engine: Engine, table, rows: Iterable[Dict], chunk_size: int) -> int:
+    total = 0
+    for chunk in chunked(rows, chunk_size):
+        with engine.begin() as conn:
+            conn.execute(insert(table), chunk)
+        total += len(chunk)
+    return total
+
+
+def seed(
+    engine: Engine,
+    users: int = 1000,
+    filler: int = 0,
+    received: int = 20,
+    vault_sizes=VAULT_SIZES,
+    chunk_size: int = 10000,
+    reset: bool = False,
+) -> Dict[str, int]:
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    # One bcrypt hash and one ciphertext shared by every row keeps seeding
+    # I/O bound; decrypt cost per entry is the same either way
+    hashed = security.get_password_hash(BENCH_PASSWORD)
+    ciphertext = security.encrypt_password("bench-secret")
+
+    emails = (
+        [vault_email(size) for size in vault_sizes]
+        + [SHARER_EMAIL]
+        + [user_email(i) for i in range(users)]
+    )
+    counts = {"users": insert_rows(engine, User.__table__, (
+        {"email": email, "hashed_password": hashed, "full_name": email.split("@")[0], "is_active": True}
+        for email in emails
+    ), chunk_size)}
+    with engine.connect() as conn:
+        ids = dict(conn.execute(select(User.email, User.id).where(User.email.endswith(DOMAIN))).all())
+    user_ids = [ids[user_email(i)] for i in range(users)]
+
+    def entries(owner_id: int, count: int, prefix: str):
+        for n in range(count):
+            yield {
+                "title": f"{prefix} {n}",
+                "username": f"login{n}",
+                "encrypted_password": ciphertext,
+                "description": f"https://site{n}.example",
+                "owner_id": owner_id,
+            }
+
+    def vault_rows():
+        for size in vault_sizes:
+            yield from entries(ids[vault_email(size)], size, f"vault-{size}")
+        yield from entries(ids[SHARER_EMAIL], 1, "fan-out")
+        if user_ids:
+            for n in range(filler):
+                yield from entries(user_ids[n % len(user_ids)], 1, f"filler {n}")
+
+    counts["passwords"] = insert_rows(engine, Password.__table__, vault_rows(), chunk_size)
+
+    shares = 0
+    if SHARE_SOURCE_VAULT in vault_sizes and received:
+        with engine.connect() as conn:
+            source_ids = conn.execute(
+                select(Password.id)
+                .where(Password.owner_id == ids[vault_email(SHARE_SOURCE_VAULT)])
+                .order_by(Password.id)
+            ).scalars().all()
+        expires_at = datetime.now().astimezone() + timedelta(days=365)
+
+        def share_rows():
+            for i, recipient_id in enumerate(user_ids):
+                for k in range(received):
+                    yield {
+                        "password_id": source_ids[(i * received + k) % len(source_ids)],
+                        "shared_with_id": recipient_id,
+                        "expires_in_hours": 24 * 365,
+                        "expires_at": expires_at,
+                        "status": ShareStatus.ACTIVE,
+                    }
+
+        shares = insert_rows(engine, SharedPassword.__table__, share_rows(), chunk_size)
+    counts["shared_passwords"] = shares
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--filler", type=int, default=0, help="extra entries spread over the users")
+    parser.add_argument("--received", type=int, default=20, help="live shares received per user")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = seed(
+        database.engine,
+        users=args.users,
+        filler=args.filler,
+        received=args.received,
+        chunk_size=args.chunk_size,
+        reset=args.reset,
+    )
+    elapsed = time.perf_counter() - started
+    print(", ".join(f"{count} {table}" for table, count in counts.items()) + f" in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
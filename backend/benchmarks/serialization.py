@@ -0,0 +1,95 @@
+"""
+Per-item cost of producing a GET /passwords/ page, split into fetching the
+rows and turning them into JSON, for each response path:
+
+  response_model  ORM objects validated into PasswordResponse, dumped by
+                  Pydantic (what FastAPI does for a response_model)
+  stdlib_json     the same validation, then jsonable_encoder + json.dumps
+                  (FastAPI's older rendering path)
+  fast_path       flat column select, dicts, orjson (app.api.fast_json)
+
+Runs against an in-memory sqlite database, so only Python-side costs show:
+
+    python -m benchmarks.serialization [--sizes 10,100,1000] [--repeat 20]
+"""
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, List
+
+from benchmarks import env  # noqa: F401  (settings defaults)
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from app.api.fast_json import FastJSONResponse
+from app.api.v1.endpoints.passwords import password_dict, password_query, password_rows
+from app.models import Base, Password, User
+from app.schemas.password import PasswordResponse
+
+page_adapter = TypeAdapter(List[PasswordResponse])
+
+
+def response_model_path(session: Session, limit: int):
+    rows = session.execute(password_query().order_by(Password.id).limit(limit)).scalars().all()
+    return rows, lambda: page_adapter.dump_json(page_adapter.validate_python(rows))
+
+
+def stdlib_json_path(session: Session, limit: int):
+    rows = session.execute(password_query().order_by(Password.id).limit(limit)).scalars().all()
+    return rows, lambda: json.dumps(jsonable_encoder(page_adapter.validate_python(rows))).encode()
+
+
+def fast_path(session: Session, limit: int):
+    rows = session.execute(password_rows().order_by(Password.id).limit(limit)).all()
+    return rows, lambda: FastJSONResponse([password_dict(row) for row in rows]).body
+
+
+PATHS = {"response_model": response_model_path, "stdlib_json": stdlib_json_path, "fast_path": fast_path}
+
+
+def measure(engine, path: Callable, limit: int, repeat: int):
+    fetch, serialize = [], []
+    for _ in range(repeat):
+        # A fresh session per sample, like one per request
+        with Session(engine) as session:
+            started = time.perf_counter()
+            rows, render = path(session, limit)
+            fetched = time.perf_counter()
+            render()
+            done = time.perf_counter()
+        fetch.append(fetched - started)
+        serialize.append(done - fetched)
+    items = len(rows)
+    return statistics.median(fetch) / items * 1e6, statistics.median(serialize) / items * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000", help="page sizes, comma separated")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "owner@example.com", "hashed_password": "x",
+                                     "full_name": "Owner", "is_active": True}])
+        conn.execute(insert(Password), [
+            {"title": f"Entry {n}", "username": f"login{n}", "encrypted_password": "x" * 100,
+             "description": f"https://site{n}.example", "owner_id": 1}
+            for n in range(max(sizes))
+        ])
+
+    print(f"{'path':<15} {'items':>6} {'fetch us/item':>14} {'json us/item':>13} {'total us/item':>14}")
+    for limit in sizes:
+        for name, path in PATHS.items():
+            fetch, serialize = measure(engine, path, limit, args.repeat)
+            print(f"{name:<15} {limit:>6} {fetch:>14.2f} {serialize:>13.2f} {fetch + serialize:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
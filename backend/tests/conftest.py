@@ -2,9 +2,6 @@ import os
 import sys
 from pathlib import Path
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.db.base_class import Base
 
 # Add the backend directory to the Python path
 backend_dir = Path(__file__).parent.parent
@@ -13,13 +10,120 @@ sys.path.append(str(backend_dir))
 # Test database URL
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
+# Settings are read at import time, so provide them before the app is imported
+os.environ.setdefault("DATABASE_URL", SQLALCHEMY_DATABASE_URL)
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+os.environ.setdefault("DB_NAME", "test")
+os.environ.setdefault("JWT_SECRET", "test-jwt-secret")
+os.environ.setdefault("ENCRYPTION_KEY", "test-encryption-key")
+# The sweeper is exercised directly in test_share_expiry.py
+os.environ.setdefault("SHARE_SWEEP_ENABLED", "false")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+TEST_USER_PASSWORD = "testpassword"
+
+def override_get_db():
+    from app.db.session import AsyncSessionAdapter
+    db = TestingSessionLocal()
+    try:
+        yield AsyncSessionAdapter(db)
+    finally:
+        db.close()
+
 @pytest.fixture(scope="session", autouse=True)
 def setup_database():
     Base.metadata.create_all(bind=engine)
     yield
-    Base.metadata.drop_all(bind=engine) 
\ No newline at end of file
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="module", params=[
+    pytest.param("sqlite", id="sqlite"),
+    pytest.param(
+        "postgresql",
+        id="postgresql",
+        marks=pytest.mark.skipif(
+            not os.environ.get("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set"
+        ),
+    ),
+])
+def backend(request):
+    """
+    Database URL to run a test against: a sqlite file named after the test
+    module, then the Postgres at TEST_POSTGRES_URL when it is set.
+    """
+    if request.param == "sqlite":
+        return f"sqlite:///./{request.module.__name__.rsplit('.', 1)[-1]}.db"
+    return os.environ["TEST_POSTGRES_URL"]
+
+@pytest.fixture(scope="module")
+def client():
+    """The app on the suite's sqlite database (through the sync session adapter)."""
+    from fastapi.testclient import TestClient
+    from app.db.session import get_db
+    from main import app
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+@pytest.fixture(scope="session")
+def auth_headers():
+    """
+    Register (if new) and log in a user through the API, returning bearer
+    headers for it::
+
+        headers = auth_headers(client, "owner@example.com")
+    """
+    def login(client, email):
+        client.post(
+            "/api/v1/auth/register",
+            json={"email": email, "password": TEST_USER_PASSWORD, "full_name": email.split("@")[0]}
+        )
+        response = client.post(
+            "/api/v1/auth/login", data={"username": email, "password": TEST_USER_PASSWORD}
+        )
+        assert response.status_code == 200
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return login
+
+@pytest.fixture
+def query_budget():
+    """
+    Count SQL statements issued inside a block and fail if they exceed a
+    fixed budget, catching N+1 lazy loads during serialization::
+
+        with query_budget(2) as statements:
+            client.get("/api/v1/passwords/", headers=headers)
+    """
+    from contextlib import contextmanager
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @contextmanager
+    def budget(max_statements):
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", count)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "before_cursor_execute", count)
+        assert len(statements) <= max_statements, (
+            f"{len(statements)} statements exceed the budget of {max_statements}:\n"
+            + "\n".join(statements)
+        )
+
+    return budget
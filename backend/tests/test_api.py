@@ -1,28 +1,10 @@
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.db.base_class import Base
+from app.models import Base
 from main import app
 from app.core.config import settings
 from app.core.security import get_password_hash
 from app.models.user import User, UserRole
-from app.db.session import get_db
-
-# Test database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
+from tests.conftest import TestingSessionLocal, engine
 
 @pytest.fixture(scope="session")
 def db():
@@ -34,13 +16,6 @@ def db():
         db.close()
         Base.metadata.drop_all(bind=engine)
 
-@pytest.fixture(scope="module")
-def client():
-    app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as c:
-        yield c
-    app.dependency_overrides.clear()
-
 @pytest.fixture(scope="module")
 def test_user(db):
     user = User(
@@ -122,6 +97,7 @@ def test_create_password(client, test_user_token):
         headers={"Authorization": f"Bearer {test_user_token}"},
         json={
             "title": "Test Password",
+            "username": "testuser",
             "password": "testpass123",
             "description": "Test password description"
         }
@@ -147,6 +123,7 @@ def test_share_password(client, test_user_token, test_admin):
         headers={"Authorization": f"Bearer {test_user_token}"},
         json={
             "title": "Shared Password",
+            "username": "shareduser",
             "password": "sharedpass123",
             "description": "Password to share"
         }
@@ -191,4 +168,354 @@ def test_user_cannot_get_users(client, test_user_token):
         "/api/v1/users/",
         headers={"Authorization": f"Bearer {test_user_token}"}
     )
-    assert response.status_code == 403 
\ No newline at end of file
+    assert response.status_code == 403 
+
+def test_principal_cache_hits_and_invalidation(client, test_user_token):
+    from app.api.deps import principal_cache
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    principal_cache.clear()
+    before = principal_cache.stats()
+
+    client.get("/api/v1/users/me", headers=headers)
+    client.get("/api/v1/users/me", headers=headers)
+    after = principal_cache.stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+    response = client.put(
+        "/api/v1/users/me", headers=headers, json={"full_name": "Cached User"}
+    )
+    assert response.status_code == 200
+    assert len(principal_cache) == 0
+    response = client.get("/api/v1/users/me", headers=headers)
+    assert response.json()["full_name"] == "Cached User"
+
+def test_received_passwords_dedupes_reshares(client, test_user_token, test_admin, test_admin_token):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    password_id = client.post(
+        "/api/v1/passwords/",
+        headers=headers,
+        json={"title": "Reshared", "username": "reshared", "password": "reshared123"}
+    ).json()["id"]
+    shares = [
+        client.post(
+            "/api/v1/shared-passwords/",
+            headers=headers,
+            json={"password_id": password_id, "shared_with_id": test_admin.id, "expires_in_hours": hours}
+        ).json()
+        for hours in (2, 1)
+    ]
+    share_ids = [share["id"] for share in shares]
+    # Re-sharing upserts the same share and never shortens its expiry
+    assert share_ids[0] == share_ids[1]
+    assert shares[1]["expires_in_hours"] == 2 and shares[1]["expires_at"] == shares[0]["expires_at"]
+
+    response = client.get(
+        "/api/v1/shared-passwords/received",
+        headers={"Authorization": f"Bearer {test_admin_token}"}
+    )
+    assert response.status_code == 200
+    matching = [sp for sp in response.json() if sp["password_id"] == password_id]
+    assert [sp["id"] for sp in matching] == [share_ids[-1]]
+
+def test_password_cursor_pagination(client, test_user_token):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    for i in range(3):
+        client.post(
+            "/api/v1/passwords/",
+            headers=headers,
+            json={"title": f"Paged {i}", "username": "paged", "password": "paged123"}
+        )
+    everything = [p["id"] for p in client.get("/api/v1/passwords/", headers=headers).json()]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        response = client.get("/api/v1/passwords/", headers=headers, params=params)
+        assert response.status_code == 200
+        seen.extend(p["id"] for p in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == everything
+
+    response = client.get("/api/v1/passwords/", headers=headers, params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def test_decrypt_batch(client, test_user_token, test_admin, test_admin_token):
+    user_headers = {"Authorization": f"Bearer {test_user_token}"}
+    admin_headers = {"Authorization": f"Bearer {test_admin_token}"}
+    own_id = client.post(
+        "/api/v1/passwords/",
+        headers=admin_headers,
+        json={"title": "Admin own", "username": "admin", "password": "admin-secret"}
+    ).json()["id"]
+    shared_id = client.post(
+        "/api/v1/passwords/",
+        headers=user_headers,
+        json={"title": "Batch shared", "username": "batch", "password": "shared-secret"}
+    ).json()["id"]
+    private_id = client.post(
+        "/api/v1/passwords/",
+        headers=user_headers,
+        json={"title": "Batch private", "username": "batch", "password": "private-secret"}
+    ).json()["id"]
+    client.post(
+        "/api/v1/shared-passwords/",
+        headers=user_headers,
+        json={"password_id": shared_id, "shared_with_id": test_admin.id, "expires_in_hours": 1}
+    )
+
+    response = client.post(
+        "/api/v1/passwords/decrypt-batch",
+        headers=admin_headers,
+        json={"ids": [own_id, shared_id, private_id, own_id]}
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "passwords": [
+            {"id": own_id, "password": "admin-secret"},
+            {"id": shared_id, "password": "shared-secret"},
+        ],
+        "denied": [private_id],
+    }
+
+def test_expiry_sweeper_stats_are_admin_only(client, test_user_token, test_admin_token, monkeypatch):
+    response = client.get(
+        "/api/v1/shared-passwords/expiry-sweeper",
+        headers={"Authorization": f"Bearer {test_admin_token}"}
+    )
+    assert response.status_code == 200
+    assert {"batch_size", "interval_seconds", "last_expired"} <= response.json().keys()
+    response = client.get(
+        "/api/v1/shared-passwords/expiry-sweeper",
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+    assert response.status_code == 403
+    monkeypatch.delattr(app.state, "share_expiry_sweeper")
+    response = client.get(
+        "/api/v1/shared-passwords/expiry-sweeper",
+        headers={"Authorization": f"Bearer {test_admin_token}"}
+    )
+    assert response.status_code == 503
+
+def test_slow_queries_record_route_and_are_admin_only(client, test_user_token, test_admin_token, monkeypatch):
+    from app.api.v1.endpoints import users
+    from app.db.slow_queries import SlowQueryLog
+    # A log of its own, hooked only for this request: later tests run unobserved
+    slow_query_log = SlowQueryLog(threshold_ms=0.000001, buffer_size=100, explain_interval=0)
+    monkeypatch.setattr(users, "slow_query_log", slow_query_log)
+    user_headers = {"Authorization": f"Bearer {test_user_token}"}
+    slow_query_log.instrument(engine)
+    try:
+        client.get("/api/v1/passwords/", headers=user_headers)
+    finally:
+        slow_query_log.uninstrument(engine)
+    slow_query_log.flush()
+    slow_query_log.stop()
+
+    response = client.get(
+        "/api/v1/users/slow-queries",
+        headers={"Authorization": f"Bearer {test_admin_token}"}
+    )
+    assert response.status_code == 200
+    routes = {query["route"] for query in response.json()["queries"]}
+    assert "/api/v1/passwords/" in routes
+    response = client.get("/api/v1/users/slow-queries", headers=user_headers)
+    assert response.status_code == 403
+
+def test_shared_count_matches_received(client, test_admin_token):
+    headers = {"Authorization": f"Bearer {test_admin_token}"}
+    received = client.get("/api/v1/shared-passwords/received", headers=headers).json()
+    count = client.get("/api/v1/shared-passwords/count", headers=headers).json()
+    assert count == len(received)
+
+def test_conditional_get_vault_received_and_profile(client, test_user_token, test_admin, test_admin_token):
+    user_headers = {"Authorization": f"Bearer {test_user_token}"}
+    admin_headers = {"Authorization": f"Bearer {test_admin_token}"}
+
+    def revalidate(url, headers):
+        first = client.get(url, headers=headers)
+        assert first.status_code == 200
+        assert first.headers["Cache-Control"] == "private, no-cache"
+        etag = first.headers["ETag"]
+        again = client.get(url, headers={**headers, "If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.headers["ETag"] == etag and again.content == b""
+        return etag
+
+    vault = revalidate("/api/v1/passwords/", user_headers)
+    assert client.get("/api/v1/passwords/?limit=1", headers={**user_headers, "If-None-Match": vault}).status_code == 200
+    received = revalidate("/api/v1/shared-passwords/received", admin_headers)
+    me = revalidate("/api/v1/users/me", user_headers)
+
+    # Creating and sharing changes the owner's vault and the recipient's received list
+    password_id = client.post(
+        "/api/v1/passwords/",
+        headers=user_headers,
+        json={"title": "Conditional", "username": "conditional", "password": "conditional123"}
+    ).json()["id"]
+    assert client.get("/api/v1/passwords/", headers={**user_headers, "If-None-Match": vault}).status_code == 200
+    share_id = client.post(
+        "/api/v1/shared-passwords/",
+        headers=user_headers,
+        json={"password_id": password_id, "shared_with_id": test_admin.id, "expires_in_hours": 1}
+    ).json()["id"]
+    response = client.get("/api/v1/shared-passwords/received", headers={**admin_headers, "If-None-Match": received})
+    assert response.status_code == 200
+
+    # Editing a shared entry or the owner's profile reaches the recipient too
+    received = revalidate("/api/v1/shared-passwords/received", admin_headers)
+    client.put(f"/api/v1/passwords/{password_id}", headers=user_headers, json={"title": "Renamed"})
+    response = client.get("/api/v1/shared-passwords/received", headers={**admin_headers, "If-None-Match": received})
+    assert response.status_code == 200
+    received = response.headers["ETag"]
+    client.put("/api/v1/users/me", headers=user_headers, json={"full_name": "Conditional User"})
+    assert client.get("/api/v1/users/me", headers={**user_headers, "If-None-Match": me}).status_code == 200
+    response = client.get("/api/v1/shared-passwords/received", headers={**admin_headers, "If-None-Match": received})
+    assert response.status_code == 200
+    received = response.headers["ETag"]
+
+    client.post(f"/api/v1/shared-passwords/{share_id}/revoke", headers=user_headers)
+    response = client.get("/api/v1/shared-passwords/received", headers={**admin_headers, "If-None-Match": received})
+    assert response.status_code == 200
+    assert password_id not in [sp["password_id"] for sp in response.json()]
+
+def test_bulk_share(client, test_user, test_user_token, test_admin, test_admin_token):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    admin_headers = {"Authorization": f"Bearer {test_admin_token}"}
+    password_ids = [
+        client.post(
+            "/api/v1/passwords/", headers=headers, json={"title": f"Team {i}", "username": "team", "password": "t"}
+        ).json()["id"]
+        for i in range(3)
+    ]
+    share_id = client.post(
+        "/api/v1/shared-passwords/",
+        headers=headers,
+        json={"password_id": password_ids[0], "shared_with_id": test_admin.id, "expires_in_hours": 1}
+    ).json()["id"]
+    client.post(f"/api/v1/shared-passwords/{share_id}/revoke", headers=headers)
+
+    # The admin named twice (id and email) is one recipient
+    response = client.post(
+        "/api/v1/shared-passwords/bulk",
+        headers=headers,
+        json={"password_ids": password_ids + password_ids[:1], "shared_with_ids": [test_admin.id],
+              "shared_with_emails": [test_admin.email, test_user.email], "expires_in_hours": 48}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["shared"] == 6
+    assert result["shared_with_ids"] == sorted([test_admin.id, test_user.id])
+    received = [
+        sp for sp in client.get("/api/v1/shared-passwords/received", headers=admin_headers).json()
+        if sp["password_id"] in password_ids
+    ]
+    assert sorted(sp["password_id"] for sp in received) == password_ids
+    # The revoked share is re-activated in place with the new expiry
+    revived = next(sp for sp in received if sp["password_id"] == password_ids[0])
+    assert revived["id"] == share_id and revived["status"] == "active" and revived["expires_in_hours"] == 48
+
+    response = client.post(
+        "/api/v1/shared-passwords/bulk",
+        headers=admin_headers,
+        json={"password_ids": password_ids, "shared_with_ids": [test_user.id], "expires_in_hours": 1}
+    )
+    assert response.status_code == 404
+    response = client.post(
+        "/api/v1/shared-passwords/bulk",
+        headers=headers,
+        json={"password_ids": password_ids, "shared_with_emails": ["nobody@example.com"], "expires_in_hours": 1}
+    )
+    assert response.status_code == 404 and "nobody@example.com" in response.json()["detail"]
+    response = client.post(
+        "/api/v1/shared-passwords/bulk", headers=headers, json={"password_ids": password_ids, "expires_in_hours": 1}
+    )
+    assert response.status_code == 400
+    # Rejected before the lookups, however long the lists
+    response = client.post(
+        "/api/v1/shared-passwords/bulk",
+        headers=headers,
+        json={"password_ids": list(range(1, 50001)), "shared_with_ids": [test_admin.id], "expires_in_hours": 1}
+    )
+    assert response.status_code == 400
+
+def test_search_passwords_ranks_and_paginates(client, test_user_token):
+    headers = {"Authorization": f"Bearer {test_user_token}"}
+    entries = [
+        ("Team wiki", "zebra-admin", "notes"),
+        ("Zebra bank", "owner", None),
+        ("Mail", "zebra", None),
+        ("Old router", "root", "label says ZEBRA_1"),
+        ("Unrelated", "nobody", "nothing here"),
+    ]
+    ids = [
+        client.post(
+            "/api/v1/passwords/",
+            headers=headers,
+            json={"title": title, "username": username, "password": "searchpass", "description": description}
+        ).json()["id"]
+        for title, username, description in entries
+    ]
+
+    response = client.get("/api/v1/passwords/", headers=headers, params={"q": "zebra"})
+    assert response.status_code == 200
+    # title prefix, username prefix (by id), description only
+    assert [p["id"] for p in response.json()] == [ids[1], ids[0], ids[2], ids[3]]
+
+    pages, params = [], {"q": "ZEBRA", "limit": 3}
+    while True:
+        response = client.get("/api/v1/passwords/", headers=headers, params=params)
+        pages.append([p["id"] for p in response.json()])
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert pages == [[ids[1], ids[0], ids[2]], [ids[3]]]
+
+    # Substrings, short queries and LIKE wildcards
+    assert [p["id"] for p in client.get("/api/v1/passwords/", headers=headers, params={"q": "bra ba"}).json()] == [ids[1]]
+    assert ids[3] in [p["id"] for p in client.get("/api/v1/passwords/", headers=headers, params={"q": "ro"}).json()]
+    assert [p["id"] for p in client.get("/api/v1/passwords/", headers=headers, params={"q": "a_1"}).json()] == [ids[3]]
+    assert client.get("/api/v1/passwords/", headers=headers, params={"q": "%"}).json() == []
+
+    # The search index follows edits and deletes
+    client.put(f"/api/v1/passwords/{ids[4]}", headers=headers, json={"title": "Zebra two"})
+    client.delete(f"/api/v1/passwords/{ids[1]}", headers=headers)
+    response = client.get("/api/v1/passwords/", headers=headers, params={"q": "zebra"})
+    assert [p["id"] for p in response.json()] == [ids[4], ids[0], ids[2], ids[3]]
+
+def test_fast_list_path_matches_response_models(client, db, test_user, test_user_token, test_admin, test_admin_token):
+    from typing import List
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+    from app.models.password import Password
+    from app.models.shared_password import SharedPassword
+    from app.schemas.auth import UserResponse
+    from app.schemas.password import PasswordResponse
+    from app.schemas.shared_password import SharedPasswordResponse
+
+    def expected(schema, rows):
+        adapter = TypeAdapter(List[schema])
+        return adapter.dump_python(adapter.validate_python(rows), mode="json")
+
+    db.expire_all()
+    user_headers = {"Authorization": f"Bearer {test_user_token}"}
+    admin_headers = {"Authorization": f"Bearer {test_admin_token}"}
+    passwords = db.execute(select(Password).filter(Password.owner_id == test_user.id).order_by(Password.id)).scalars().all()
+    assert client.get("/api/v1/passwords/", headers=user_headers).json() == expected(PasswordResponse, passwords)
+
+    shared = db.execute(
+        select(SharedPassword).join(Password).filter(Password.owner_id == test_user.id).order_by(SharedPassword.id)
+    ).scalars().all()
+    assert shared
+    response = client.get("/api/v1/shared-passwords/shared", headers=user_headers)
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == expected(SharedPasswordResponse, shared)
+
+    received = client.get("/api/v1/shared-passwords/received", headers=admin_headers).json()
+    by_id = {sp.id: sp for sp in db.execute(select(SharedPassword)).scalars()}
+    assert received == expected(SharedPasswordResponse, [by_id[sp["id"]] for sp in received])
+
+    users = db.execute(select(User).order_by(User.id)).scalars().all()
+    assert client.get("/api/v1/users/", headers=admin_headers).json() == expected(UserResponse, users)
@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from main import app
+from app.db.session import get_db
+
+# Same database as the sync tests, reached through the aiosqlite driver
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+AsyncTestingSessionLocal = sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+async def override_get_db():
+    async with AsyncTestingSessionLocal() as session:
+        yield session
+
+@pytest.fixture(scope="module")
+def client():
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+def test_async_session_password_and_share_flow(client, auth_headers):
+    owner = auth_headers(client, "async-owner@example.com")
+    recipient = auth_headers(client, "async-recipient@example.com")
+    recipient_id = client.get("/api/v1/users/me", headers=recipient).json()["id"]
+
+    response = client.post(
+        "/api/v1/passwords/",
+        headers=owner,
+        json={"title": "Async", "username": "async", "password": "s3cret"}
+    )
+    assert response.status_code == 200
+    password = response.json()
+    assert password["owner"]["email"] == "async-owner@example.com"
+
+    response = client.get("/api/v1/passwords/", headers=owner)
+    assert response.status_code == 200
+    assert [p["id"] for p in response.json()] == [password["id"]]
+
+    response = client.get("/api/v1/passwords/export", headers=owner)
+    assert response.status_code == 200
+    assert '"password":"s3cret"' in response.text
+
+    response = client.post(
+        "/api/v1/shared-passwords/",
+        headers=owner,
+        json={"password_id": password["id"], "shared_with_id": recipient_id, "expires_in_hours": 1}
+    )
+    assert response.status_code == 200
+    assert response.json()["password"]["owner"]["email"] == "async-owner@example.com"
+
+    response = client.get("/api/v1/shared-passwords/received", headers=recipient)
+    assert response.status_code == 200
+    assert [sp["password_id"] for sp in response.json()] == [password["id"]]
+
+    response = client.get(f"/api/v1/passwords/{password['id']}/decrypt", headers=recipient)
+    assert response.status_code == 200
+    assert response.json() == {"password": "s3cret"}
+
+    response = client.put(
+        "/api/v1/users/me", headers=recipient, json={"full_name": "Renamed"}
+    )
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Renamed"
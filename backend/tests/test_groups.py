@@ -0,0 +1,106 @@
+from sqlalchemy import func, select, update
+from app.models import Group, GroupShare, User
+from app.models.user import UserRole
+from tests.conftest import TestingSessionLocal
+
+def user_id(client, headers):
+    return client.get("/api/v1/users/me", headers=headers).json()["id"]
+
+def received_ids(client, headers):
+    return [entry["password_id"] for entry in client.get("/api/v1/groups/received", headers=headers).json()]
+
+def can_decrypt(client, headers, password_id):
+    return client.get(f"/api/v1/passwords/{password_id}/decrypt", headers=headers).status_code == 200
+
+def group_share_rows():
+    with TestingSessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(GroupShare))
+
+def test_group_sharing_resolves_access_through_membership(client, auth_headers):
+    owner = auth_headers(client, "group-owner@example.com")
+    alice = auth_headers(client, "group-alice@example.com")
+    bob = auth_headers(client, "group-bob@example.com")
+    bob_id = user_id(client, bob)
+
+    group = client.post("/api/v1/groups/", headers=owner, json={"name": "Engineering"}).json()
+    response = client.post(
+        f"/api/v1/groups/{group['id']}/members", headers=owner, json={"emails": ["group-alice@example.com"]}
+    )
+    assert response.json() == {"added": 1}
+    password_ids = [
+        client.post("/api/v1/passwords/", headers=owner, json={"title": f"Infra {i}", "username": "ops", "password": f"s{i}"}).json()["id"]
+        for i in range(2)
+    ]
+    response = client.post(
+        f"/api/v1/groups/{group['id']}/shares", headers=owner, json={"password_ids": password_ids, "expires_in_hours": 24}
+    )
+    assert response.status_code == 200 and response.json()["shared"] == 2
+    shares = group_share_rows()
+
+    assert sorted(received_ids(client, alice)) == password_ids
+    assert received_ids(client, owner) == []
+    assert client.post("/api/v1/passwords/decrypt-batch", headers=alice, json={"ids": password_ids}).json()["denied"] == []
+    assert not can_decrypt(client, bob, password_ids[0])
+    etag = client.get("/api/v1/groups/received", headers=bob).headers["ETag"]
+
+    # Joining the group grants access without writing share rows
+    client.post(f"/api/v1/groups/{group['id']}/members", headers=owner, json={"user_ids": [bob_id]})
+    assert group_share_rows() == shares
+    response = client.get("/api/v1/groups/received", headers={**bob, "If-None-Match": etag})
+    assert response.status_code == 200 and sorted(e["password_id"] for e in response.json()) == password_ids
+    assert can_decrypt(client, bob, password_ids[0])
+    members = client.get(f"/api/v1/groups/{group['id']}/members", headers=bob).json()
+    assert [m["email"] for m in members] == ["group-owner@example.com", "group-alice@example.com", "group-bob@example.com"]
+
+    # Leaving ends access at once; revoking a share ends it for everyone
+    assert client.delete(f"/api/v1/groups/{group['id']}/members/{bob_id}", headers=bob).status_code == 200
+    assert not can_decrypt(client, bob, password_ids[0])
+    client.post(f"/api/v1/groups/{group['id']}/shares/{password_ids[0]}/revoke", headers=owner)
+    assert received_ids(client, alice) == [password_ids[1]]
+    assert not can_decrypt(client, alice, password_ids[0])
+
+def test_group_permissions(client, auth_headers):
+    owner = auth_headers(client, "perm-owner@example.com")
+    member = auth_headers(client, "perm-member@example.com")
+    outsider = auth_headers(client, "perm-outsider@example.com")
+    owner_id = user_id(client, owner)
+    group_id = client.post("/api/v1/groups/", headers=owner, json={"name": "Finance"}).json()["id"]
+    client.post(f"/api/v1/groups/{group_id}/members", headers=owner, json={"emails": ["perm-member@example.com"]})
+
+    response = client.post(f"/api/v1/groups/{group_id}/members", headers=member, json={"user_ids": [owner_id]})
+    assert response.status_code == 403
+    response = client.post(
+        f"/api/v1/groups/{group_id}/members", headers=owner, json={"user_ids": list(range(1, 50001))}
+    )
+    assert response.status_code == 400
+    assert client.get(f"/api/v1/groups/{group_id}/members", headers=outsider).status_code == 404
+    assert client.delete(f"/api/v1/groups/{group_id}/members/{owner_id}", headers=owner).status_code == 400
+    # Members can only share their own passwords
+    foreign_id = client.post(
+        "/api/v1/passwords/", headers=outsider, json={"title": "Not yours", "username": "x", "password": "x"}
+    ).json()["id"]
+    response = client.post(
+        f"/api/v1/groups/{group_id}/shares", headers=member, json={"password_ids": [foreign_id], "expires_in_hours": 1}
+    )
+    assert response.status_code == 404
+    assert [g["name"] for g in client.get("/api/v1/groups/", headers=member).json()] == ["Finance"]
+
+    assert client.delete(f"/api/v1/groups/{group_id}", headers=member).status_code == 403
+    assert client.delete(f"/api/v1/groups/{group_id}", headers=owner).status_code == 200
+    assert client.get("/api/v1/groups/", headers=member).json() == []
+
+def test_deleting_a_user_removes_their_groups(client, auth_headers):
+    admin = auth_headers(client, "group-admin@example.com")
+    with TestingSessionLocal() as db:
+        db.execute(update(User).where(User.email == "group-admin@example.com").values(role=UserRole.ADMIN))
+        db.commit()
+    owner = auth_headers(client, "leaving-owner@example.com")
+    member = auth_headers(client, "staying-member@example.com")
+    owner_id = user_id(client, owner)
+    group_id = client.post("/api/v1/groups/", headers=owner, json={"name": "Temporary"}).json()["id"]
+    client.post(f"/api/v1/groups/{group_id}/members", headers=owner, json={"emails": ["staying-member@example.com"]})
+
+    assert client.delete(f"/api/v1/users/{owner_id}", headers=admin).status_code == 200
+    assert client.get("/api/v1/groups/", headers=member).json() == []
+    with TestingSessionLocal() as db:
+        assert db.get(Group, group_id) is None
@@ -0,0 +1,39 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.core import hashing
+from main import app
+
+def test_process_pool_hash_and_verify():
+    hasher = hashing.PasswordHasher(workers=1, queue_limit=4, retry_after=1)
+    try:
+        hashed = asyncio.run(hasher.hash("hunter2"))
+        assert asyncio.run(hasher.verify("hunter2", hashed))
+        assert not asyncio.run(hasher.verify("wrong", hashed))
+    finally:
+        hasher.shutdown()
+    snapshot = hasher.metrics.snapshot()
+    assert snapshot["completed"] == 3
+    assert snapshot["hash_seconds_total"] > 0
+    assert hasher.pending == 0
+
+def test_full_queue_is_rejected():
+    hasher = hashing.PasswordHasher(workers=0, queue_limit=0, retry_after=7)
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(hasher.hash("hunter2"))
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": "7"}
+    assert hasher.metrics.snapshot()["rejected"] == 1
+
+def test_login_returns_503_when_hash_queue_is_full(monkeypatch):
+    monkeypatch.setattr(
+        hashing, "password_hasher", hashing.PasswordHasher(workers=0, queue_limit=0, retry_after=3)
+    )
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/auth/register",
+            json={"email": "queued@example.com", "password": "pw", "full_name": "Queued"}
+        )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
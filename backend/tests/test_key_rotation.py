@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import create_engine, insert, select
+from app.core import security
+from app.core.config import settings
+from app.models import Base, Password, User
+from app.tasks.key_rotation import KeyRotationJob
+
+OLD_KEY = Fernet.generate_key()
+NEW_KEY = Fernet.generate_key()
+UPDATED_AT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+@pytest.fixture
+def rotated_keys(monkeypatch):
+    """Current key NEW_KEY, with OLD_KEY still accepted for decryption."""
+    monkeypatch.setattr(settings, "ENCRYPTION_KEY_DERIVED", NEW_KEY.decode())
+    monkeypatch.setattr(settings, "ENCRYPTION_PREVIOUS_KEYS_DERIVED", OLD_KEY.decode())
+    security.get_primary_key.cache_clear()
+    security.get_fernet.cache_clear()
+    yield
+    monkeypatch.undo()
+    security.get_primary_key.cache_clear()
+    security.get_fernet.cache_clear()
+
+@pytest.fixture
+def engine(backend):
+    engine = create_engine(backend)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    old, new = Fernet(OLD_KEY), Fernet(NEW_KEY)
+    tokens = [old.encrypt(f"secret-{n}".encode()).decode() for n in range(7)]
+    tokens.append(new.encrypt(b"secret-7").decode())
+    tokens.append("not-a-fernet-token")
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "rotate@example.com", "hashed_password": "x"}])
+        conn.execute(insert(Password), [
+            {"id": n + 1, "title": "t", "username": "u", "encrypted_password": token, "owner_id": 1,
+             "updated_at": UPDATED_AT}
+            for n, token in enumerate(tokens)
+        ])
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+def test_old_ciphertext_still_decrypts_after_rotation(rotated_keys):
+    token = Fernet(OLD_KEY).encrypt(b"legacy").decode()
+    assert security.decrypt_password(token) == "legacy"
+    fresh = security.encrypt_password("fresh")
+    assert Fernet(NEW_KEY).decrypt(fresh.encode()) == b"fresh"
+
+def test_rotation_is_resumable_and_reencrypts_under_current_key(engine, rotated_keys):
+    job = KeyRotationJob(engine, batch_size=3)
+    progress = job.run(max_batches=1)
+    assert progress["last_password_id"] == 3
+    assert progress["rotated"] == 3 and not progress["completed"]
+
+    # A new runner picks up from the checkpoint
+    progress = KeyRotationJob(engine, batch_size=3).run()
+    assert progress == {
+        "key_id": security.key_id(NEW_KEY),
+        "last_password_id": 9,
+        "rotated": 7,
+        "already_current": 1,
+        "failed": 1,
+        "completed": True,
+    }
+    with engine.connect() as conn:
+        rows = conn.execute(select(Password.encrypted_password, Password.updated_at).order_by(Password.id)).all()
+    current = Fernet(NEW_KEY)
+    assert [current.decrypt(row.encrypted_password.encode()) for row in rows[:8]] == [
+        f"secret-{n}".encode() for n in range(8)
+    ]
+    assert all(row.updated_at.replace(tzinfo=timezone.utc) == UPDATED_AT for row in rows)
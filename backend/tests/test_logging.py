@@ -0,0 +1,48 @@
+import json
+import logging
+import queue
+from fastapi.testclient import TestClient
+from app.core import logging as app_logging
+from main import app
+
+def make_record(level=logging.DEBUG, **extra):
+    record = logging.makeLogRecord({"name": "app.test", "levelno": level, "levelname": logging.getLevelName(level), "msg": "hello %s", "args": ("world",)})
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_includes_request_id_and_extra():
+    token = app_logging.request_id_var.set("req-1")
+    try:
+        record = make_record(password_id=5)
+        app_logging.RequestIdFilter().filter(record)
+    finally:
+        app_logging.request_id_var.reset(token)
+    entry = json.loads(app_logging.JsonFormatter().format(record))
+    assert entry["msg"] == "hello world"
+    assert entry["request_id"] == "req-1"
+    assert entry["password_id"] == 5
+    assert entry["level"] == "DEBUG"
+
+def test_sampling_keeps_warnings():
+    sampler = app_logging.SamplingFilter(rate=0.0)
+    assert not sampler.filter(make_record(logging.DEBUG))
+    assert sampler.filter(make_record(logging.WARNING))
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = app_logging.DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(make_record())
+    handler.handle(make_record())
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+def test_parse_levels():
+    assert app_logging.parse_levels("app.api=debug, sqlalchemy.engine=WARNING") == {
+        "app.api": "DEBUG",
+        "sqlalchemy.engine": "WARNING",
+    }
+
+def test_request_id_header_round_trip():
+    with TestClient(app) as client:
+        response = client.get("/", headers={"X-Request-ID": "abc123"})
+        assert response.headers["X-Request-ID"] == "abc123"
+        assert client.get("/").headers["X-Request-ID"]
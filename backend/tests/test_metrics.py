@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+def sample(text, name, **labels):
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    prefix = f"{name}{{{wanted}}} " if labels else f"{name} "
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.split()[-1])
+    return None
+
+def test_metrics_endpoint_reports_routes_db_and_crypto(client, auth_headers):
+    headers = auth_headers(client, "metrics@example.com")
+    password_id = client.post(
+        "/api/v1/passwords/", headers=headers,
+        json={"title": "m", "username": "m", "password": "m"}
+    ).json()["id"]
+    client.get(f"/api/v1/passwords/{password_id}/decrypt", headers=headers)
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    text = response.text
+    route = "/api/v1/passwords/{password_id}/decrypt"
+    assert sample(text, "http_requests_total", method="GET", route=route, status="200") >= 1
+    assert sample(text, "http_request_duration_seconds_count", method="GET", route=route) >= 1
+    assert sample(text, "db_statements_per_request_count", route=route) >= 1
+    assert sample(text, "db_statements_total") >= 1
+    assert sample(text, "crypto_operation_duration_seconds_count", operation="decrypt") >= 1
+    assert sample(text, "cache_requests_total", cache="token", result="miss") >= 1
+    assert sample(text, "password_hash_duration_seconds_count") >= 1
+
+def test_multiprocess_metrics_are_aggregated(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    bump = "from app.core import metrics; metrics.REQUESTS.labels('GET', '/x', '200').inc()"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", bump], cwd=BACKEND_DIR, env=env, check=True)
+    scrape = "from app.core import metrics; print(metrics.render_metrics().body.decode())"
+    output = subprocess.run(
+        [sys.executable, "-c", scrape], cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    assert sample(output, "http_requests_total", method="GET", route="/x", status="200") == 2
@@ -0,0 +1,94 @@
+import os
+import time
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool, QueuePool
+from app.core.config import settings
+from app.db.pool import create_pooled_engine, pool_options
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+needs_postgres = pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+
+def value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def test_pool_options_follow_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 2)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", "always")
+    options = pool_options("postgresql://app@db/app", "sized")
+    assert issubclass(options["poolclass"], QueuePool)
+    assert options["pool_size"] == 3 and options["max_overflow"] == 2 and options["pool_pre_ping"] is True
+
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    options = pool_options("postgresql+asyncpg://app@pgbouncer/app", "bouncer")
+    assert issubclass(options["poolclass"], NullPool) and "pool_size" not in options
+    assert options["connect_args"] == {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+
+    # sqlite keeps its default pool and never gets sizing arguments
+    options = pool_options("sqlite:///./test.db", "sqlite")
+    assert "pool_size" not in options and options["connect_args"] == {"check_same_thread": False}
+
+def test_pool_metrics_track_checkouts_and_churn():
+    engine = create_pooled_engine(create_engine, "sqlite:///./test_pool.db", "test_sqlite")
+    checkouts = value("db_pool_checkout_duration_seconds_count", pool="test_sqlite")
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+        assert value("db_pool_checked_out", pool="test_sqlite") == 1
+    engine.dispose()
+    assert value("db_pool_checked_out", pool="test_sqlite") == 0
+    assert value("db_pool_checkout_duration_seconds_count", pool="test_sqlite") == checkouts + 1
+    # sqlite files use a NullPool: every checkout opens and closes a connection
+    assert value("db_pool_connections_total", pool="test_sqlite", event="opened") >= 1
+    assert value("db_pool_connections_total", pool="test_sqlite", event="closed") >= 1
+
+@needs_postgres
+def test_pool_timeout_is_counted(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.1)
+    engine = create_pooled_engine(create_engine, POSTGRES_URL, "test_timeout")
+    assert value("db_pool_capacity", pool="test_timeout") == 1
+    timeouts = value("db_pool_timeouts_total", pool="test_timeout")
+    try:
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+    finally:
+        engine.dispose()
+    assert value("db_pool_timeouts_total", pool="test_timeout") == timeouts + 1
+
+@needs_postgres
+def test_idle_pre_ping_replaces_dead_connections(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", "idle")
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING_IDLE", 0)
+    engine = create_pooled_engine(create_engine, POSTGRES_URL, "test_ping")
+    admin = create_engine(POSTGRES_URL)
+    try:
+        with engine.connect() as conn:
+            pid = conn.exec_driver_sql("SELECT pg_backend_pid()").scalar()
+        with admin.connect() as conn:
+            conn.exec_driver_sql(f"SELECT pg_terminate_backend({pid})")
+        time.sleep(0.1)
+        invalidated = value("db_pool_connections_total", pool="test_ping", event="invalidated")
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT pg_backend_pid()").scalar() != pid
+        assert value("db_pool_connections_total", pool="test_ping", event="invalidated") == invalidated + 1
+    finally:
+        engine.dispose()
+        admin.dispose()
+
+@needs_postgres
+@pytest.mark.asyncio
+async def test_async_engine_pool_is_instrumented():
+    url = POSTGRES_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+    engine = create_pooled_engine(create_async_engine, url, "test_async")
+    try:
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+            assert value("db_pool_checked_out", pool="test_async") == 1
+    finally:
+        await engine.dispose()
+    assert value("db_pool_checked_out", pool="test_async") == 0
@@ -0,0 +1,89 @@
+import pytest
+
+ITEMS = 15
+
+@pytest.fixture(scope="module")
+def vault(client, auth_headers):
+    """An owner with ITEMS passwords, each shared with a different recipient."""
+    owner = auth_headers(client, "budget-owner@example.com")
+    recipient = auth_headers(client, "budget-recipient@example.com")
+    recipient_id = client.get("/api/v1/users/me", headers=recipient).json()["id"]
+    for i in range(ITEMS):
+        password = client.post(
+            "/api/v1/passwords/",
+            headers=owner,
+            json={"title": f"Entry {i}", "username": "svc", "password": f"secret-{i}"}
+        ).json()
+        client.post(
+            "/api/v1/shared-passwords/",
+            headers=owner,
+            json={"password_id": password["id"], "shared_with_id": recipient_id, "expires_in_hours": 1}
+        )
+    return owner, recipient
+
+# One statement for the page itself, plus the ETag version read where the
+# listing supports conditional GETs; the principal is served from cache
+@pytest.mark.parametrize("path, who, budget", [
+    ("/api/v1/passwords/", "owner", 2),
+    ("/api/v1/shared-passwords/shared", "owner", 1),
+    ("/api/v1/shared-passwords/received", "recipient", 2),
+])
+def test_listing_query_budget(client, vault, query_budget, path, who, budget):
+    headers = vault[0] if who == "owner" else vault[1]
+    client.get("/api/v1/users/me", headers=headers)  # warm the principal cache
+    with query_budget(budget):
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == ITEMS
+
+# A revalidation that matches costs only the version read
+@pytest.mark.parametrize("path, who", [
+    ("/api/v1/passwords/", "owner"),
+    ("/api/v1/shared-passwords/received", "recipient"),
+])
+def test_not_modified_query_budget(client, vault, query_budget, path, who):
+    headers = vault[0] if who == "owner" else vault[1]
+    etag = client.get(path, headers=headers).headers["ETag"]
+    with query_budget(1):
+        response = client.get(path, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+# A reveal is one authorization query; repeating it is served by the access cache
+def test_decrypt_query_budget(client, vault, query_budget):
+    from app.api.deps import access_cache
+    owner, recipient = vault
+    share = client.get("/api/v1/shared-passwords/shared", headers=owner).json()[0]
+    path = f"/api/v1/passwords/{share['password_id']}/decrypt"
+    client.get("/api/v1/users/me", headers=recipient)
+    access_cache.clear()
+    with query_budget(1):
+        first = client.get(path, headers=recipient)
+    with query_budget(0):
+        second = client.get(path, headers=recipient)
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+
+    # Revoking drops the cached grant at once
+    client.post(f"/api/v1/shared-passwords/{share['id']}/revoke", headers=owner)
+    assert client.get(path, headers=recipient).status_code == 404
+
+def test_access_cache_invalidation_scopes():
+    from app.core.cache import AccessCache
+    cache = AccessCache(maxsize=16, ttl=60)
+    for user_id, password_id in [(1, 10), (1, 11), (2, 10)]:
+        cache.set(user_id, password_id, f"c{user_id}-{password_id}", cache.begin())
+    cache.set(3, 10, "expired", cache.begin(), ttl=0)
+    assert cache.get(3, 10) is None
+
+    cache.invalidate(password_id=10)
+    assert (cache.get(1, 10), cache.get(2, 10), cache.get(1, 11)) == (None, None, "c1-11")
+    cache.invalidate(user_id=1)
+    assert cache.get(1, 11) is None
+
+    # A grant read before an invalidation is not cached after it
+    tick = cache.begin()
+    cache.invalidate(2, 12)
+    cache.set(2, 12, "stale", tick)
+    assert cache.get(2, 12) is None
+    cache.set(2, 12, "fresh", cache.begin())
+    assert cache.get(2, 12) == "fresh"
@@ -0,0 +1,170 @@
+"""
+Query-plan regression tests for the hot read paths.
+
+Seeds a database at a realistic scale, drives each endpoint while recording
+the SQL it emits, then EXPLAINs every statement and fails if any of them
+falls back to a sequential scan. Runs against sqlite by default; set
+TEST_POSTGRES_URL to also check the Postgres plans (including the partial
+index on active shares).
+"""
+import random
+import re
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+from app.api.deps import access_cache, principal_cache
+from app.api.pagination import encode_cursor
+from app.core import security
+from app.db.session import AsyncSessionAdapter, get_db
+from app.models import Base, Group, GroupMember, GroupShare, Password, SharedPassword, User
+from app.models.shared_password import ShareStatus
+from main import app
+
+SEED_USERS = 2000
+SEED_PASSWORDS_PER_USER = 10
+SEED_SHARES_PER_USER = 20
+SEED_GROUPS = 1000
+SEED_GROUP_SIZE = 10
+
+def seed(engine):
+    rng = random.Random(42)
+    now = datetime.now().astimezone()
+    ciphertext = security.encrypt_password("seeded")
+    users = [
+        {"id": i, "email": f"user{i}@example.com", "hashed_password": "x", "full_name": f"User {i}", "is_active": True}
+        for i in range(1, SEED_USERS + 1)
+    ]
+    password_count = SEED_USERS * SEED_PASSWORDS_PER_USER
+    passwords = [
+        {"id": i, "title": f"Entry {i}", "username": "svc", "encrypted_password": ciphertext,
+         "owner_id": (i - 1) // SEED_PASSWORDS_PER_USER + 1, "is_active": True}
+        for i in range(1, password_count + 1)
+    ]
+    statuses = [ShareStatus.ACTIVE] * 6 + [ShareStatus.EXPIRED, ShareStatus.REVOKED]
+    # Keyed by (password, recipient): the pair is unique
+    shares = {
+        (rng.randint(1, password_count), rng.randint(1, SEED_USERS)): {
+            "status": rng.choice(statuses), "expires_at": now + timedelta(hours=rng.randint(-240, 240)),
+            "expires_in_hours": 24, "created_at": now - timedelta(minutes=rng.randint(0, 100000))}
+        for _ in range(SEED_USERS * SEED_SHARES_PER_USER)
+    }
+    # Make sure the probe user has something to find in every direction
+    shares[1, 2] = {"status": ShareStatus.ACTIVE, "expires_at": now + timedelta(days=1),
+                    "expires_in_hours": 24, "created_at": now}
+    shares[SEED_PASSWORDS_PER_USER + 1, 1] = {"status": ShareStatus.ACTIVE, "expires_at": now + timedelta(days=1),
+                                              "expires_in_hours": 24, "created_at": now}
+    shares = [{"password_id": password_id, "shared_with_id": shared_with_id, **share}
+              for (password_id, shared_with_id), share in shares.items()]
+    # Groups of random members, each sharing a few of its owner's passwords;
+    # the probe user is in group 1, owned by user 2
+    groups = [{"id": g, "name": f"Group {g}", "owner_id": g + 1} for g in range(1, SEED_GROUPS + 1)]
+    members = {(g["id"], g["owner_id"]) for g in groups} | {(1, 1)}
+    members |= {(rng.randint(1, SEED_GROUPS), rng.randint(1, SEED_USERS)) for _ in range(SEED_GROUPS * SEED_GROUP_SIZE)}
+    group_shares = [
+        {"password_id": g["owner_id"] * SEED_PASSWORDS_PER_USER - k, "group_id": g["id"],
+         "status": rng.choice(statuses), "expires_at": now + timedelta(hours=rng.randint(-240, 240)),
+         "expires_in_hours": 24}
+        for g in groups for k in range(5)
+    ]
+    group_shares[0].update(status=ShareStatus.ACTIVE, expires_at=now + timedelta(days=1))
+    with engine.begin() as conn:
+        conn.execute(insert(User), users)
+        conn.execute(insert(Password), passwords)
+        conn.execute(insert(SharedPassword), shares)
+        conn.execute(insert(Group), groups)
+        conn.execute(insert(GroupMember), [{"group_id": g, "user_id": u} for g, u in sorted(members)])
+        conn.execute(insert(GroupShare), group_shares)
+        conn.execute(text("ANALYZE"))
+
+@pytest.fixture(scope="module")
+def seeded_engine(backend):
+    url = backend
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    seed(engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+@pytest.fixture
+def plan_client(seeded_engine):
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=seeded_engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield AsyncSessionAdapter(db)
+        finally:
+            db.close()
+
+    principal_cache.clear()
+    access_cache.clear()
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+    principal_cache.clear()
+    access_cache.clear()
+
+def sequential_scans(conn, statement, parameters):
+    """
+    Tables read with a full scan by ``statement``. Scans of derived tables
+    (subqueries already narrowed through an index) are not counted.
+    """
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+        scans, nodes = [], [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan":
+                scans.append(node["Relation Name"])
+            nodes.extend(node.get("Plans", []))
+        return scans
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    scanned = [m.group(2) for m in (re.match(r"SCAN (TABLE )?(\w+)$", row[-1]) for row in rows) if m]
+    return [name for name in scanned if name in Base.metadata.tables]
+
+HOT_PATHS = [
+    "/api/v1/passwords/",
+    "/api/v1/passwords/1",
+    "/api/v1/passwords/1/decrypt",
+    f"/api/v1/passwords/{SEED_PASSWORDS_PER_USER + 1}/decrypt",
+    "/api/v1/shared-passwords/received",
+    "/api/v1/shared-passwords/shared",
+    "/api/v1/shared-passwords/count",
+    f"/api/v1/passwords/?limit=2&cursor={encode_cursor(id=3)}",
+    f"/api/v1/shared-passwords/shared?limit=2&cursor={encode_cursor(id=1)}",
+    f"/api/v1/shared-passwords/received?limit=2&cursor={encode_cursor(id=10 ** 9)}",
+    "/api/v1/passwords/?q=ntry 1",
+    "/api/v1/passwords/?q=En",
+    f"/api/v1/passwords/?q=ntry&limit=2&cursor={encode_cursor(rank=2, id=3)}",
+    "/api/v1/groups/received",
+    f"/api/v1/groups/received?limit=2&cursor={encode_cursor(id=10 ** 9)}",
+    f"/api/v1/passwords/{2 * SEED_PASSWORDS_PER_USER}/decrypt",
+]
+
+@pytest.mark.parametrize("path", HOT_PATHS)
+def test_hot_path_uses_indexes(plan_client, seeded_engine, path):
+    token = security.create_access_token({"sub": "1"}, expires_delta=timedelta(minutes=5))
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(seeded_engine, "before_cursor_execute", capture)
+    try:
+        response = plan_client.get(path, headers={"Authorization": f"Bearer {token}"})
+    finally:
+        event.remove(seeded_engine, "before_cursor_execute", capture)
+    assert response.status_code == 200, response.text
+    assert statements
+
+    with seeded_engine.connect() as conn:
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            assert sequential_scans(conn, statement, parameters) == [], statement
@@ -0,0 +1,109 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, insert, select
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.session import Database
+from app.models import Base, Password, User
+from main import app
+
+# The primary is the suite's test.db; this file stands in for a replica
+REPLICA_URL = "sqlite:///./test_replica.db"
+
+def value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+@pytest.fixture
+def replica_engine():
+    engine = create_engine(REPLICA_URL)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+@pytest.fixture
+def routed(monkeypatch):
+    """Use a fresh Database with the given replica URLs, torn down afterwards."""
+    databases = []
+
+    def configure(urls):
+        monkeypatch.setattr(settings, "DB_REPLICA_URLS", urls)
+        database = Database()
+        databases.append(database)
+        monkeypatch.setattr(db_session, "database", database)
+        return database
+
+    yield configure
+    for database in databases:
+        for replica in database._replicas or ():
+            replica.engine.dispose()
+        if database._engine is not None:
+            database._engine.dispose()
+
+def login(client, auth_headers, email):
+    headers = auth_headers(client, email)
+    # Registering committed; start without a sticky cookie
+    client.cookies.clear()
+    return headers
+
+def copy_to_replica(replica_engine, user_id):
+    """Replay the user's primary rows on the replica, as replication would."""
+    primary = db_session.database.engine
+    with primary.connect() as conn:
+        user = conn.execute(select(User.__table__).where(User.id == user_id)).mappings().first()
+        passwords = conn.execute(select(Password.__table__).where(Password.owner_id == user_id)).mappings().all()
+    with replica_engine.begin() as conn:
+        conn.execute(insert(User.__table__), [dict(user)])
+        conn.execute(insert(Password.__table__), [dict(row) for row in passwords])
+
+def test_reads_use_replica_except_right_after_a_write(monkeypatch, routed, replica_engine, auth_headers):
+    monkeypatch.setattr(settings, "DB_REPLICA_STICKY_SECONDS", 0.3)
+    routed(REPLICA_URL)
+    client = TestClient(app)
+    headers = login(client, auth_headers, "replica-owner@example.com")
+    user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+
+    sticky = value("db_read_routes_total", target="primary", reason="sticky")
+    response = client.post("/api/v1/passwords/", headers=headers, json={"title": "Lagging", "username": "u", "password": "p"})
+    assert response.status_code == 200
+    assert "db_primary_until" in response.cookies
+    # Read-your-writes: the new entry is visible although the replica lags
+    assert [p["title"] for p in client.get("/api/v1/passwords/", headers=headers).json()] == ["Lagging"]
+    assert value("db_read_routes_total", target="primary", reason="sticky") == sticky + 1
+
+    time.sleep(0.4)
+    served = value("db_read_routes_total", target="replica", reason="healthy")
+    assert client.get("/api/v1/passwords/", headers=headers).json() == []
+    copy_to_replica(replica_engine, user_id)
+    assert [p["title"] for p in client.get("/api/v1/passwords/", headers=headers).json()] == ["Lagging"]
+    assert client.get("/api/v1/shared-passwords/count", headers=headers).json() == 0
+    assert value("db_read_routes_total", target="replica", reason="healthy") == served + 3
+
+def test_sticky_cookie_covers_other_workers(monkeypatch, routed, replica_engine, auth_headers):
+    routed(REPLICA_URL)
+    client = TestClient(app)
+    headers = login(client, auth_headers, "replica-cookie@example.com")
+    client.post("/api/v1/passwords/", headers=headers, json={"title": "Fresh", "username": "u", "password": "p"})
+    # Another worker has no in-process record of the write, only the cookie
+    db_session.read_your_writes._recent.invalidate(headers["Authorization"])
+    assert [p["title"] for p in client.get("/api/v1/passwords/", headers=headers).json()] == ["Fresh"]
+    client.cookies.clear()
+    assert client.get("/api/v1/passwords/", headers=headers).json() == []
+
+def test_unreachable_replica_falls_back(routed, replica_engine, auth_headers):
+    database = routed("sqlite:////nonexistent/replica.db," + REPLICA_URL)
+    client = TestClient(app)
+    headers = login(client, auth_headers, "replica-fallback@example.com")
+
+    failures = value("db_replica_failures_total", replica="replica0")
+    assert client.get("/api/v1/passwords/", headers=headers).status_code == 200
+    assert value("db_replica_failures_total", replica="replica0") == failures + 1
+    assert [replica.name for replica in database.healthy_replicas()] == ["replica1"]
+
+    # With every replica down, reads go to the primary
+    database.replicas[1].mark_down()
+    unavailable = value("db_read_routes_total", target="primary", reason="unavailable")
+    assert client.get("/api/v1/passwords/", headers=headers).status_code == 200
+    assert value("db_read_routes_total", target="primary", reason="unavailable") == unavailable + 1
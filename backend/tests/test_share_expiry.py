@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, insert, select, text
+from app.models import Base, Group, GroupShare, Password, SharedPassword, User
+from app.models.shared_password import ShareStatus
+from app.tasks.share_expiry import SWEEP_LOCK_KEY, ShareExpirySweeper
+
+@pytest.fixture
+def engine(backend):
+    engine = create_engine(backend)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now().astimezone()
+    shares = (
+        [(ShareStatus.ACTIVE, now - timedelta(hours=h)) for h in range(1, 6)]
+        + [(ShareStatus.ACTIVE, now + timedelta(hours=h)) for h in range(1, 3)]
+        + [(ShareStatus.REVOKED, now - timedelta(hours=1))]
+    )
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "sweep@example.com", "hashed_password": "x"}])
+        # One password per share: a password has a single share per recipient
+        conn.execute(insert(Password), [
+            {"id": i, "title": "t", "username": "u", "encrypted_password": "x", "owner_id": 1}
+            for i in range(1, len(shares) + 1)
+        ])
+        conn.execute(insert(SharedPassword), [
+            {"password_id": i, "shared_with_id": 1, "status": share_status, "expires_at": expires_at, "expires_in_hours": 1}
+            for i, (share_status, expires_at) in enumerate(shares, 1)
+        ])
+        # Group shares expire too: one due, one live
+        conn.execute(insert(Group), [{"id": 1, "name": "g", "owner_id": 1}])
+        conn.execute(insert(GroupShare), [
+            {"password_id": i, "group_id": 1, "status": ShareStatus.ACTIVE,
+             "expires_at": now + timedelta(hours=hours), "expires_in_hours": 1}
+            for i, hours in ((1, -1), (2, 1))
+        ])
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+def statuses(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(select(SharedPassword.status)).scalars().all()
+    return {s: rows.count(s) for s in ShareStatus}
+
+def test_sweep_expires_due_shares_in_batches(engine):
+    sweeper = ShareExpirySweeper(engine, batch_size=2, interval=60)
+    assert sweeper.sweep_once() == 6
+    assert statuses(engine) == {ShareStatus.ACTIVE: 2, ShareStatus.EXPIRED: 5, ShareStatus.REVOKED: 1}
+    with engine.connect() as conn:
+        assert conn.execute(select(GroupShare.status).order_by(GroupShare.id)).scalars().all() == [
+            ShareStatus.EXPIRED, ShareStatus.ACTIVE
+        ]
+    snapshot = sweeper.snapshot()
+    assert snapshot["last_expired"] == 6
+    # Three batches of direct shares, one of group shares
+    assert snapshot["last_batches"] == 4
+    assert sweeper.sweep_once() == 0
+    assert sweeper.snapshot()["total_expired"] == 6
+
+def test_sweep_skips_while_another_worker_holds_the_lock(engine):
+    if engine.dialect.name != "postgresql":
+        pytest.skip("advisory locks are Postgres only")
+    sweeper = ShareExpirySweeper(engine, batch_size=2, interval=60)
+    with engine.connect() as other_worker:
+        with other_worker.begin():
+            other_worker.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SWEEP_LOCK_KEY})
+        assert sweeper.sweep_once() is None
+        assert sweeper.stats.skipped_locked == 1
+        with other_worker.begin():
+            other_worker.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SWEEP_LOCK_KEY})
+    assert sweeper.sweep_once() == 6
@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import async_url
+from app.db.slow_queries import SlowQueryLog, redact
+from app.models import Base, User
+
+@pytest.fixture
+def engine(backend):
+    engine = create_engine(backend)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "slow@example.com", "hashed_password": "secret-hash"}])
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+def test_redact_keeps_only_types():
+    assert redact({"email": "a@b.c", "id": 1}) == {"email": "str", "id": "int"}
+    assert redact(("secret", 2)) == ["str", "int"]
+    assert redact([{"x": b"raw"}]) == [{"x": "bytes"}]
+
+def test_slow_statement_is_recorded_with_plan(engine):
+    log = SlowQueryLog(threshold_ms=0.000001, buffer_size=10, explain_interval=60)
+    log.instrument(engine)
+    with engine.connect() as conn:
+        conn.execute(select(User).where(User.email == "slow@example.com")).all()
+        conn.execute(select(User).where(User.id == 1)).all()
+    log.flush()
+    log.stop()
+    log.threshold_ms = 0
+
+    queries = log.snapshot()["queries"]
+    assert len(queries) == 2
+    newest, oldest = queries
+    assert "slow@example.com" not in repr(queries)
+    assert oldest["plan"] and oldest["plan_skipped"] is None
+    if engine.dialect.name == "postgresql":
+        assert any("Buffers" in line or "actual time" in line for line in oldest["plan"])
+    # a second plan within the interval is rate limited
+    assert newest["plan"] is None and newest["plan_skipped"] == "rate limited"
+    assert oldest["route"] is None
+
+def test_explain_analyze_leaves_writes_untouched(engine):
+    log = SlowQueryLog(threshold_ms=0.000001, buffer_size=10, explain_interval=0)
+    log.instrument(engine)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE users SET full_name = 'x' WHERE id = 1"))
+    log.flush()
+    log.stop()
+    log.threshold_ms = 0
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT full_name FROM users WHERE id = 1")).scalar() == "x"
+    assert log.snapshot()["queries"][0]["plan"]
+
+def test_disabled_threshold_records_nothing(engine):
+    log = SlowQueryLog(threshold_ms=0, buffer_size=10, explain_interval=0)
+    log.instrument(engine)
+    with engine.connect() as conn:
+        conn.execute(select(User)).all()
+    log.flush()
+    assert log.snapshot()["queries"] == []
+
+def test_failed_explain_still_records_the_query(engine, monkeypatch):
+    log = SlowQueryLog(threshold_ms=0.000001, buffer_size=10, explain_interval=0)
+
+    def broken_explain(sql, parameters):
+        raise RuntimeError("no plan")
+
+    monkeypatch.setattr(log, "_explain", broken_explain)
+    log.instrument(engine)
+    with engine.connect() as conn:
+        conn.execute(select(User).where(User.id == 1)).all()
+    log.flush()
+    log.stop()
+    log.threshold_ms = 0
+    [query] = log.snapshot()["queries"]
+    assert query["plan"] is None and query["plan_skipped"] == "explain failed: RuntimeError"
+
+def test_async_statements_are_recorded_without_a_plan(engine):
+    async_engine = create_async_engine(async_url(engine.url.render_as_string(hide_password=False)))
+    log = SlowQueryLog(threshold_ms=0.000001, buffer_size=10, explain_interval=0)
+    log.instrument(engine)
+    log.instrument(async_engine.sync_engine)
+
+    async def run():
+        async with async_engine.connect() as conn:
+            await conn.execute(select(User).where(User.id == 1))
+        await async_engine.dispose()
+
+    asyncio.run(run())
+    log.flush()
+    log.stop()
+    log.threshold_ms = 0
+    [query] = log.snapshot()["queries"]
+    assert query["plan"] is None and query["plan_skipped"] == "async engine"
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+from pathlib import Path
+from fastapi.testclient import TestClient
+from app.core import security
+from app.core.config import settings
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+def test_import_derives_no_key_and_opens_no_engine():
+    probe = (
+        "import app.main\n"
+        "from app.core import security\n"
+        "from app.db.session import database\n"
+        "print(security.get_primary_key.cache_info().currsize, database._engine)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    assert output.strip().splitlines()[-1] == "0 None"
+
+def test_pre_derived_key_matches_runtime_derivation(monkeypatch):
+    ciphertext = security.encrypt_password("vault-secret")
+    derived = security.derive_fernet_key(settings.ENCRYPTION_KEY).decode()
+    monkeypatch.setattr(settings, "ENCRYPTION_KEY_DERIVED", derived)
+    security.get_primary_key.cache_clear()
+    security.get_fernet.cache_clear()
+    try:
+        assert security.decrypt_password(ciphertext) == "vault-secret"
+    finally:
+        monkeypatch.undo()
+        security.get_primary_key.cache_clear()
+        security.get_fernet.cache_clear()
+
+def test_create_app_builds_independent_apps():
+    from app.main import create_app
+    first, second = create_app(), create_app()
+    assert first is not second
+    with TestClient(first) as client:
+        assert client.get("/").status_code == 200
+        assert first.state.share_expiry_sweeper.running is False
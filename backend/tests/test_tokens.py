@@ -0,0 +1,45 @@
+from datetime import timedelta
+import pytest
+from app.core import security, tokens
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+class CountingVerifier:
+    name = "counting"
+
+    def __init__(self):
+        self.backend = tokens.JoseVerifier(settings.JWT_SECRET, settings.JWT_ALGORITHM)
+        self.calls = 0
+
+    def decode(self, token):
+        self.calls += 1
+        return self.backend.decode(token)
+
+def make_token(**delta):
+    return security.create_access_token({"sub": "7"}, expires_delta=timedelta(**delta))
+
+def test_repeated_token_skips_backend():
+    backend = CountingVerifier()
+    verifier = tokens.TokenVerifier(backend, TTLCache(maxsize=16, ttl=300))
+    token = make_token(hours=1)
+    assert verifier.verify(token).sub == 7
+    assert verifier.verify(token).sub == 7
+    assert backend.calls == 1
+    assert verifier.cache.stats()["hits"] == 1
+
+def test_expired_and_invalid_tokens_are_rejected():
+    verifier = tokens.TokenVerifier(CountingVerifier(), TTLCache(maxsize=16, ttl=300))
+    with pytest.raises(tokens.TokenError):
+        verifier.verify(make_token(seconds=-1))
+    with pytest.raises(tokens.TokenError):
+        verifier.verify(make_token(hours=1) + "x")
+    assert len(verifier.cache) == 0
+
+@pytest.mark.parametrize("backend", sorted(tokens.VERIFIER_BACKENDS))
+def test_backends_agree(backend):
+    if backend == "pyjwt":
+        pytest.importorskip("jwt")
+    verifier = tokens.get_verifier(backend, settings.JWT_SECRET, settings.JWT_ALGORITHM)
+    assert verifier.decode(make_token(hours=1))["sub"] == "7"
+    with pytest.raises(tokens.TokenError):
+        verifier.decode(make_token(seconds=-1))
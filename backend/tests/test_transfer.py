@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from app.core.config import settings
+
+def test_ndjson_import_then_export(client, monkeypatch, auth_headers):
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 2)
+    headers = auth_headers(client, "ndjson-transfer@example.com")
+    entries = [
+        {"title": f"Entry {i}", "username": f"user{i}", "password": f"secret-{i}", "description": None}
+        for i in range(5)
+    ]
+    lines = [json.dumps(e) for e in entries[:3]] + ["{not json", '{"title": "no password"}'] + [json.dumps(e) for e in entries[3:]]
+    response = client.post(
+        "/api/v1/passwords/import",
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+        content="\n".join(lines).encode(),
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["imported"] == 5
+    assert result["failed"] == 2
+    assert [e["line"] for e in result["errors"]] == [4, 5]
+    assert [c["imported"] for c in result["chunks"]] == [2, 2, 1]
+
+    response = client.get("/api/v1/passwords/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in response.text.splitlines()] == entries
+
+def test_csv_import_then_export(client, auth_headers):
+    headers = auth_headers(client, "csv-transfer@example.com")
+    body = 'title,username,password,description\nMail,me,"p,w",\nBank,me,x,"two\nlines"\n'
+    response = client.post(
+        "/api/v1/passwords/import",
+        headers={**headers, "Content-Type": "text/csv"},
+        params={"format": "csv"},
+        content=body.encode(),
+    )
+    assert response.status_code == 200
+    assert response.json()["imported"] == 2
+
+    response = client.get("/api/v1/passwords/export", headers=headers, params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(r["title"], r["password"], r["description"]) for r in rows] == [
+        ("Mail", "p,w", ""),
+        ("Bank", "x", "two\nlines"),
+    ]
+
+def test_import_bounds_unterminated_quotes_and_long_lines(client, monkeypatch, auth_headers):
+    monkeypatch.setattr(settings, "IMPORT_MAX_RECORD_BYTES", 200)
+    headers = auth_headers(client, "bad-quote-transfer@example.com")
+    # The stray quote swallows following lines only up to the record limit
+    rows = ['Broken,me,"oops,'] + [f"Row {i},me,pw{i}," for i in range(2000)]
+    body = "title,username,password,description\n" + "\n".join(rows) + "\n"
+    response = client.post(
+        "/api/v1/passwords/import",
+        headers={**headers, "Content-Type": "text/csv"},
+        params={"format": "csv"},
+        content=body.encode(),
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["failed"] == 1
+    assert "record longer than 200 bytes" in result["errors"][0]["detail"]
+    assert result["imported"] > 1950
+
+    lines = [json.dumps({"title": "Long", "username": "me", "password": "x" * 300}), '{"title": "Ok", "username": "me", "password": "p"}']
+    response = client.post(
+        "/api/v1/passwords/import",
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+        content="\n".join(lines).encode(),
+    )
+    assert response.json()["imported"] == 1
+    assert response.json()["errors"] == [{"line": 1, "detail": "line longer than 200 bytes"}]